@@ -0,0 +1,75 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Matches the tables previously created by Base.metadata.create_all. Tables
+that already exist (databases created that way before migrations were
+introduced) are left untouched, so `alembic upgrade head` works on them
+without a manual stamp.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "channels" not in existing:
+        op.create_table(
+            "channels",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("m3u8_url", sa.String(length=2048), nullable=False),
+            sa.Column("timezone", sa.String(length=50), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "recordings" not in existing:
+        op.create_table(
+            "recordings",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("channel_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("start_time", sa.DateTime(), nullable=False),
+            sa.Column("end_time", sa.DateTime(), nullable=False),
+            sa.Column(
+                "status",
+                sa.Enum("SCHEDULED", "RECORDING", "COMPLETED", "FAILED", "CANCELLED", name="recordingstatus"),
+                nullable=False,
+            ),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["channel_id"], ["channels.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "recorded_files" not in existing:
+        op.create_table(
+            "recorded_files",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("recording_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("file_path", sa.String(length=1024), nullable=False),
+            sa.Column("file_size", sa.BigInteger(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["recording_id"], ["recordings.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("recording_id"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("recorded_files")
+    op.drop_table("recordings")
+    op.drop_table("channels")
+    sa.Enum(name="recordingstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,37 @@
+"""recorded file integrity columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # All nullable without defaults, so no table rewrite is needed
+    op.add_column("recorded_files", sa.Column("checksum_sha256", sa.String(length=64), nullable=True))
+    op.add_column("recorded_files", sa.Column("duration_seconds", sa.Float(), nullable=True))
+    op.add_column("recorded_files", sa.Column("bitrate", sa.BigInteger(), nullable=True))
+    op.add_column("recorded_files", sa.Column("continuity_errors", sa.Integer(), nullable=True))
+    op.add_column("recorded_files", sa.Column("pcr_discontinuities", sa.Integer(), nullable=True))
+    op.add_column("recorded_files", sa.Column("verified_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("recorded_files", "verified_at")
+    op.drop_column("recorded_files", "pcr_discontinuities")
+    op.drop_column("recorded_files", "continuity_errors")
+    op.drop_column("recorded_files", "bitrate")
+    op.drop_column("recorded_files", "duration_seconds")
+    op.drop_column("recorded_files", "checksum_sha256")
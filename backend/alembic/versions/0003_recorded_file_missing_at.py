@@ -0,0 +1,54 @@
+"""recorded file missing_at for the reconciler
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+The index is built with CREATE INDEX CONCURRENTLY on PostgreSQL so
+recorded_files stays writable on large libraries.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = ("ix_recorded_files_missing_at", "recorded_files", ["missing_at"])
+
+
+def upgrade() -> None:
+    # The column is committed before the concurrent build, so a retried upgrade may find it
+    if context.is_offline_mode():
+        columns = set()
+    else:
+        columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("recorded_files")}
+    if "missing_at" not in columns:
+        op.add_column("recorded_files", sa.Column("missing_at", sa.DateTime(), nullable=True))
+
+    name, table, columns = INDEX
+    if op.get_context().dialect.name != "postgresql":
+        op.create_index(name, table, columns)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index behind; drop it so a retry rebuilds it
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    name, table, _ = INDEX
+    if op.get_context().dialect.name != "postgresql":
+        op.drop_index(name, table_name=table)
+    else:
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_column("recorded_files", "missing_at")
@@ -0,0 +1,48 @@
+"""recording range lookup index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+The index is built with CREATE INDEX CONCURRENTLY on PostgreSQL so the
+recordings table stays writable while the scheduler is running.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_recordings_channel_id_start_time", "recordings", ["channel_id", "start_time"]),
+]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            # A failed concurrent build leaves an INVALID index behind; drop it so a retry rebuilds it
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
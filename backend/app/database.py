@@ -1,3 +1,5 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -19,3 +21,26 @@ def get_db():
     finally:
         db.close()
 
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def check_schema_revision():
+    """DBのスキーマがマイグレーションの最新リビジョンか確認
+
+    スキーマの作成・変更は `alembic upgrade head` で行い、起動時は確認のみ行う。
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}. "
+            "Run `alembic upgrade head`."
+        )
+    return current
@@ -1,17 +1,48 @@
+import time
+
+_import_started = time.perf_counter()
+
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.database import engine, Base
-from app.routers import channels, recordings, files
-from app.scheduler import start_scheduler, shutdown_scheduler
+from app.database import check_schema_revision
+from app.routers import channels, recordings, files, timeline
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging():
+    """appパッケージのログをuvicornと同じ形式で出力（ルートロガーは変更しない）"""
+    app_logger = logging.getLogger("app")
+    if app_logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s - %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(logging.INFO)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    startup_started = time.perf_counter()
+    configure_logging()
+    revision = check_schema_revision()
+    schema_checked = time.perf_counter()
+    
+    # Deferred so the scheduler and its dependencies are only loaded by the server process
+    from app.scheduler import start_scheduler, shutdown_scheduler
     start_scheduler()
+    
+    startup_finished = time.perf_counter()
+    logger.info(
+        f"Startup completed in {(startup_finished - _import_started) * 1000:.0f} ms "
+        f"(import {(startup_started - _import_started) * 1000:.0f} ms, "
+        f"schema check {(schema_checked - startup_started) * 1000:.0f} ms at revision {revision}, "
+        f"scheduler {(startup_finished - schema_checked) * 1000:.0f} ms)"
+    )
     yield
     # Shutdown
     shutdown_scheduler()
@@ -35,6 +66,7 @@ app.add_middleware(
 app.include_router(channels.router, prefix="/api/channels", tags=["channels"])
 app.include_router(recordings.router, prefix="/api/recordings", tags=["recordings"])
 app.include_router(files.router, prefix="/api/files", tags=["files"])
+app.include_router(timeline.router, prefix="/api/timeline", tags=["timeline"])
 
 
 @app.get("/api/health")
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, BigInteger, ForeignKey
+from sqlalchemy import Column, String, DateTime, BigInteger, Integer, Float, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -14,6 +14,13 @@ class RecordedFile(Base):
     recording_id = Column(UUID(as_uuid=True), ForeignKey("recordings.id"), nullable=False, unique=True)
     file_path = Column(String(1024), nullable=False)
     file_size = Column(BigInteger, nullable=True)
+    checksum_sha256 = Column(String(64), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    bitrate = Column(BigInteger, nullable=True)  # bits per second
+    continuity_errors = Column(Integer, nullable=True)
+    pcr_discontinuities = Column(Integer, nullable=True)
+    verified_at = Column(DateTime, nullable=True)
+    missing_at = Column(DateTime, nullable=True, index=True)  # Set by the reconciler
     created_at = Column(DateTime, default=datetime.utcnow)
 
     recording = relationship("Recording", back_populates="recorded_file")
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -18,6 +18,9 @@ class RecordingStatus(str, enum.Enum):
 
 class Recording(Base):
     __tablename__ = "recordings"
+    __table_args__ = (
+        Index("ix_recordings_channel_id_start_time", "channel_id", "start_time"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     channel_id = Column(UUID(as_uuid=True), ForeignKey("channels.id"), nullable=False)
@@ -7,13 +7,14 @@ import pytz
 from app.database import get_db
 from app.models.channel import Channel
 from app.schemas.channel import ChannelCreate, ChannelUpdate, ChannelResponse
+from app.services.timezones import get_timezone
 
 router = APIRouter()
 
 
 def validate_timezone(timezone: str) -> bool:
     try:
-        pytz.timezone(timezone)
+        get_timezone(timezone)
         return True
     except pytz.exceptions.UnknownTimeZoneError:
         return False
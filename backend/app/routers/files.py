@@ -1,18 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from uuid import UUID
+from datetime import datetime
 import os
 
 from app.database import get_db
 from app.models.recorded_file import RecordedFile
-from app.schemas.recorded_file import RecordedFileResponse
+from app.schemas.recorded_file import (
+    RecordedFileResponse,
+    FileVerificationResponse,
+    ReconcileReport,
+    MissingFile,
+    UntrackedFile,
+)
 from app.config import get_settings
+from app.services import thumbnails
+from app.services.integrity import compute_sha256
+from app.services.reconciler import reconciler
 
 router = APIRouter()
 settings = get_settings()
 
+# Preview images never change for a given file id
+PREVIEW_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+PREVIEW_RETRY_AFTER = 3
+
+
+def resolve_file_path(file: RecordedFile) -> str:
+    """録画ファイルの絶対パスを取得"""
+    file_path = file.file_path
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(settings.recordings_path, file_path)
+    return file_path
+
+
+def serve_preview(file_id: UUID, db: Session, generate) -> Response:
+    file = db.query(RecordedFile).filter(RecordedFile.id == file_id).first()
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    try:
+        image = generate(file.id, resolve_file_path(file))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found on disk")
+    except thumbnails.ThumbnailError:
+        raise HTTPException(status_code=404, detail="Preview not available")
+
+    if image is None:
+        # Rendering in the background; the client retries later
+        return Response(
+            status_code=202,
+            headers={"Retry-After": str(PREVIEW_RETRY_AFTER), "Cache-Control": "no-store"},
+        )
+
+    return Response(content=image, media_type="image/jpeg", headers=PREVIEW_CACHE_HEADERS)
+
 
 @router.get("", response_model=List[RecordedFileResponse])
 def get_files(db: Session = Depends(get_db)):
@@ -27,6 +71,58 @@ def get_files(db: Session = Depends(get_db)):
     return files
 
 
+def build_reconcile_report(db: Session, limit: int) -> ReconcileReport:
+    missing_query = db.query(RecordedFile).filter(RecordedFile.missing_at.isnot(None))
+    missing = missing_query.order_by(RecordedFile.missing_at.desc()).limit(limit).all()
+    
+    from app.scheduler import active_writers
+    
+    # Files still being written have no RecordedFile yet
+    in_progress = {writer.output_path for writer in active_writers.values()}
+    untracked = reconciler.untracked_files(exclude=in_progress)
+    
+    return ReconcileReport(
+        watching=reconciler.watching,
+        last_scan_at=reconciler.last_scan_at,
+        last_full_sync_at=reconciler.last_full_sync_at,
+        disk_file_count=reconciler.disk_file_count(),
+        db_file_count=db.query(RecordedFile).count(),
+        missing_count=missing_query.count(),
+        untracked_count=len(untracked),
+        missing_on_disk=[
+            MissingFile(id=f.id, file_path=f.file_path, missing_at=f.missing_at)
+            for f in missing
+        ],
+        untracked_on_disk=[
+            UntrackedFile(
+                file_path=path,
+                file_size=disk.size,
+                modified_at=datetime.utcfromtimestamp(disk.mtime),
+            )
+            for path, disk in untracked[:limit]
+        ],
+    )
+
+
+@router.get("/reconcile/report", response_model=ReconcileReport)
+def get_reconcile_report(
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """ディスクとDBの不整合レポートを取得"""
+    return build_reconcile_report(db, limit)
+
+
+@router.post("/reconcile", response_model=ReconcileReport)
+def run_reconcile(
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """ディスクとDBの同期を即時実行"""
+    reconciler.run_once(db)
+    return build_reconcile_report(db, limit)
+
+
 @router.get("/{file_id}", response_model=RecordedFileResponse)
 def get_file(file_id: UUID, db: Session = Depends(get_db)):
     """録画ファイル詳細を取得"""
@@ -49,9 +145,7 @@ def download_file(file_id: UUID, db: Session = Depends(get_db)):
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     
-    file_path = file.file_path
-    if not os.path.isabs(file_path):
-        file_path = os.path.join(settings.recordings_path, file_path)
+    file_path = resolve_file_path(file)
     
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found on disk")
@@ -64,6 +158,53 @@ def download_file(file_id: UUID, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/{file_id}/verify", response_model=FileVerificationResponse)
+def verify_file(file_id: UUID, db: Session = Depends(get_db)):
+    """録画ファイルを保存済みのチェックサムと照合"""
+    file = db.query(RecordedFile).filter(RecordedFile.id == file_id).first()
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if not file.checksum_sha256:
+        raise HTTPException(status_code=400, detail="No checksum recorded for this file")
+    
+    file_path = resolve_file_path(file)
+    
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="File not found on disk")
+    
+    actual_size = os.path.getsize(file_path)
+    actual_sha256 = compute_sha256(file_path)
+    valid = actual_sha256 == file.checksum_sha256 and actual_size == file.file_size
+    
+    verified_at = datetime.utcnow()
+    if valid:
+        file.verified_at = verified_at
+        db.commit()
+    
+    return FileVerificationResponse(
+        file_id=file.id,
+        valid=valid,
+        expected_sha256=file.checksum_sha256,
+        actual_sha256=actual_sha256,
+        expected_size=file.file_size,
+        actual_size=actual_size,
+        verified_at=verified_at,
+    )
+
+
+@router.get("/{file_id}/thumbnail")
+def get_thumbnail(file_id: UUID, db: Session = Depends(get_db)):
+    """録画ファイルのサムネイルを取得"""
+    return serve_preview(file_id, db, thumbnails.get_thumbnail)
+
+
+@router.get("/{file_id}/sprite")
+def get_sprite(file_id: UUID, db: Session = Depends(get_db)):
+    """シークプレビュー用のスプライトシートを取得"""
+    return serve_preview(file_id, db, thumbnails.get_sprite)
+
+
 @router.delete("/{file_id}", status_code=204)
 def delete_file(file_id: UUID, db: Session = Depends(get_db)):
     """録画ファイルを削除"""
@@ -71,13 +212,12 @@ def delete_file(file_id: UUID, db: Session = Depends(get_db)):
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     
-    file_path = file.file_path
-    if not os.path.isabs(file_path):
-        file_path = os.path.join(settings.recordings_path, file_path)
+    file_path = resolve_file_path(file)
     
     # Delete file from disk
     if os.path.exists(file_path):
         os.remove(file_path)
+    thumbnails.discard(file.id)
     
     # Delete record from database
     db.delete(file)
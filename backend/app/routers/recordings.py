@@ -3,7 +3,6 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-import pytz
 
 from app.database import get_db
 from app.models.channel import Channel
@@ -14,6 +13,8 @@ from app.schemas.recording import (
     RecordingResponse,
     TimeConversionResponse,
 )
+from app.services.timezones import get_timezone, as_utc
+from app.services import recording_span
 
 router = APIRouter()
 
@@ -60,6 +61,7 @@ def create_recording(recording_data: RecordingCreate, db: Session = Depends(get_
         raise HTTPException(status_code=400, detail="End time must be after start time")
     
     recording = Recording(**recording_data.model_dump())
+    recording_span.note_duration(recording.end_time - recording.start_time)
     db.add(recording)
     db.commit()
     db.refresh(recording)
@@ -108,6 +110,7 @@ def update_recording(
     
     for key, value in update_data.items():
         setattr(recording, key, value)
+    recording_span.note_duration(end_time - start_time)
     
     db.commit()
     db.refresh(recording)
@@ -144,12 +147,11 @@ def convert_recording_time(recording_id: UUID, db: Session = Depends(get_db)):
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
     
-    channel_tz = pytz.timezone(recording.channel.timezone)
-    utc = pytz.UTC
+    channel_tz = get_timezone(recording.channel.timezone)
     
     # Convert UTC to channel timezone
-    start_utc = utc.localize(recording.start_time) if recording.start_time.tzinfo is None else recording.start_time
-    end_utc = utc.localize(recording.end_time) if recording.end_time.tzinfo is None else recording.end_time
+    start_utc = as_utc(recording.start_time)
+    end_utc = as_utc(recording.end_time)
     
     start_local = start_utc.astimezone(channel_tz)
     end_local = end_utc.astimezone(channel_tz)
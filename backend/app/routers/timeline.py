@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from uuid import UUID
+from datetime import date, datetime, timedelta
+
+from app.database import get_db
+from app.models.channel import Channel
+from app.models.recording import Recording
+from app.schemas.timeline import (
+    TimelineRecording,
+    TimelineDay,
+    ChannelTimeline,
+    TimelineResponse,
+)
+from app.services.timezones import get_timezone, as_utc, to_naive_utc
+from app.services.recording_span import max_recording_duration
+
+router = APIRouter()
+
+MAX_RANGE = timedelta(days=92)
+
+
+@router.get("", response_model=TimelineResponse)
+def get_timeline(
+    range_start: datetime = Query(..., alias="from"),
+    range_end: datetime = Query(..., alias="to"),
+    channel_id: Optional[UUID] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """期間内の録画予約をチャンネル・チャンネル現地日付ごとに取得
+
+    日付をまたぐ録画は、期間内で重なっている各日付の下に繰り返し含まれる。
+    """
+    start = to_naive_utc(range_start)
+    end = to_naive_utc(range_end)
+    
+    if end <= start:
+        raise HTTPException(status_code=400, detail="End time must be after start time")
+    if end - start > MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Time range is too large")
+    
+    # No recording is longer than the stored maximum, so start_time is bounded on both
+    # sides and ix_recordings_channel_id_start_time is used as a range scan
+    earliest_start = start - max_recording_duration(db)
+    
+    # Outer join keeps channels without recordings in the range; one round trip
+    query = (
+        db.query(Channel, Recording)
+        .outerjoin(
+            Recording,
+            and_(
+                Recording.channel_id == Channel.id,
+                Recording.start_time >= earliest_start,
+                Recording.start_time < end,
+                Recording.end_time > start,
+            ),
+        )
+    )
+    if channel_id:
+        query = query.filter(Channel.id == channel_id)
+    
+    rows = query.order_by(Channel.name, Channel.id, Recording.start_time).all()
+    
+    channels: Dict[UUID, ChannelTimeline] = {}
+    days: Dict[UUID, Dict[date, TimelineDay]] = {}
+    range_start_utc = as_utc(start)
+    range_end_utc = as_utc(end)
+    for channel, recording in rows:
+        timeline = channels.get(channel.id)
+        if timeline is None:
+            timeline = ChannelTimeline(
+                channel_id=channel.id,
+                channel_name=channel.name,
+                channel_timezone=channel.timezone,
+                days=[],
+            )
+            channels[channel.id] = timeline
+            days[channel.id] = {}
+        if recording is None:
+            continue
+        
+        channel_tz = get_timezone(channel.timezone)
+        start_utc = as_utc(recording.start_time)
+        end_utc = as_utc(recording.end_time)
+        start_local = start_utc.astimezone(channel_tz)
+        end_local = end_utc.astimezone(channel_tz)
+        entry = TimelineRecording(
+            id=recording.id,
+            title=recording.title,
+            status=recording.status,
+            utc_start_time=start_utc,
+            utc_end_time=end_utc,
+            channel_start_time=start_local.strftime("%Y-%m-%d %H:%M"),
+            channel_end_time=end_local.strftime("%Y-%m-%d %H:%M"),
+        )
+        
+        # List the recording under every local day it covers inside the requested range
+        first_day = max(start_utc, range_start_utc).astimezone(channel_tz).date()
+        last_day = (min(end_utc, range_end_utc) - timedelta(microseconds=1)).astimezone(channel_tz).date()
+        channel_days = days[channel.id]
+        day = first_day
+        while day <= last_day:
+            timeline_day = channel_days.get(day)
+            if timeline_day is None:
+                timeline_day = TimelineDay(date=day.isoformat(), recordings=[])
+                channel_days[day] = timeline_day
+            # Rows are ordered by start time, so each day's list stays sorted
+            timeline_day.recordings.append(entry)
+            day += timedelta(days=1)
+    
+    for key, timeline in channels.items():
+        timeline.days = [days[key][d] for d in sorted(days[key])]
+    
+    if channel_id and not channels:
+        raise HTTPException(status_code=404, detail="Channel not found")
+    
+    return TimelineResponse(
+        range_start=range_start_utc,
+        range_end=range_end_utc,
+        channels=list(channels.values()),
+    )
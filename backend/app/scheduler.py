@@ -2,7 +2,7 @@ import subprocess
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Optional
 from uuid import UUID
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -13,12 +13,16 @@ from app.database import SessionLocal
 from app.models.recording import Recording, RecordingStatus
 from app.models.recorded_file import RecordedFile
 from app.config import get_settings
+from app.services import thumbnails
+from app.services.integrity import CaptureResult, CaptureWriter
+from app.services.reconciler import reconciler
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 scheduler = BackgroundScheduler()
 active_recordings: Dict[UUID, subprocess.Popen] = {}
+active_writers: Dict[UUID, CaptureWriter] = {}
 
 
 def get_output_filename(recording: Recording) -> str:
@@ -37,27 +41,33 @@ def start_recording(recording_id: UUID, m3u8_url: str, output_path: str):
             "-i", m3u8_url,
             "-c", "copy",  # Copy without re-encoding
             "-f", "mpegts",  # Output format
-            output_path
+            "pipe:1",  # Written to output_path by CaptureWriter
         ]
         
-        logger.info(f"Starting recording {recording_id}: {' '.join(cmd)}")
+        logger.info(f"Starting recording {recording_id}: {' '.join(cmd)} > {output_path}")
         
-        # Fix for hypothesis A: Use DEVNULL to avoid buffer overflow deadlock
+        # stdout carries the stream and is drained continuously by CaptureWriter.
+        # stderr is discarded so an unread pipe can never block ffmpeg.
         process = subprocess.Popen(
             cmd,
-            stdout=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
         )
         
+        # Hash and analyze the stream as it is written instead of re-reading it later
+        writer = CaptureWriter(process.stdout, output_path)
+        writer.start()
+        
         active_recordings[recording_id] = process
+        active_writers[recording_id] = writer
         return True
     except Exception as e:
         logger.error(f"Failed to start recording {recording_id}: {e}")
         return False
 
 
-def stop_recording(recording_id: UUID) -> bool:
-    """録画を停止"""
+def stop_recording(recording_id: UUID) -> Optional[CaptureResult]:
+    """録画を停止し、書き込み結果と書き込み中に計算した整合性情報を返す"""
     if recording_id in active_recordings:
         process = active_recordings[recording_id]
         try:
@@ -70,8 +80,9 @@ def stop_recording(recording_id: UUID) -> bool:
             logger.error(f"Error stopping recording {recording_id}: {e}")
         
         del active_recordings[recording_id]
-        return True
-    return False
+        writer = active_writers.pop(recording_id)
+        return writer.finish(timeout=30)
+    return None
 
 
 def check_recordings():
@@ -103,8 +114,15 @@ def check_recordings():
         ).all()
         
         for recording in recordings_to_stop:
-            if stop_recording(recording.id):
-                recording.status = RecordingStatus.COMPLETED
+            capture = stop_recording(recording.id)
+            if capture is not None:
+                if capture.ok:
+                    recording.status = RecordingStatus.COMPLETED
+                else:
+                    # A failed write (e.g. disk full) kills the capture; the file is incomplete
+                    recording.status = RecordingStatus.FAILED
+                    reason = capture.error or "capture writer did not finish"
+                    logger.error(f"Recording {recording.title} failed during capture: {reason}")
                 
                 # Create recorded file entry
                 filename = get_output_filename(recording)
@@ -114,14 +132,32 @@ def check_recordings():
                 if os.path.exists(output_path):
                     file_size = os.path.getsize(output_path)
                 
+                # Only trust the inline digest if the capture succeeded and covers the whole file
+                integrity = {}
+                stats = capture.stats
+                if capture.ok and file_size is not None and stats.size == file_size:
+                    integrity = dict(
+                        checksum_sha256=stats.sha256,
+                        duration_seconds=stats.duration_seconds,
+                        bitrate=stats.bitrate,
+                        continuity_errors=stats.continuity_errors,
+                        pcr_discontinuities=stats.pcr_discontinuities,
+                    )
+                
                 recorded_file = RecordedFile(
                     recording_id=recording.id,
                     file_path=filename,
                     file_size=file_size,
+                    **integrity,
                 )
                 db.add(recorded_file)
                 db.commit()
-                logger.info(f"Completed recording: {recording.title}")
+                reconciler.mark_tracked(filename)
+                if capture.ok:
+                    logger.info(f"Completed recording: {recording.title}")
+                
+                if file_size:
+                    thumbnails.schedule_generation(recorded_file.id, output_path)
         
         # Check for cancelled recordings
         cancelled_recordings = db.query(Recording).filter(
@@ -153,6 +189,17 @@ def check_recordings():
         db.close()
 
 
+def reconcile_files():
+    """録画ディレクトリとDBを同期"""
+    db: Session = SessionLocal()
+    try:
+        reconciler.run_once(db)
+    except Exception as e:
+        logger.error(f"Error in reconcile_files: {e}")
+    finally:
+        db.close()
+
+
 def start_scheduler():
     """スケジューラーを開始"""
     scheduler.add_job(
@@ -161,6 +208,14 @@ def start_scheduler():
         id="check_recordings",
         replace_existing=True,
     )
+    reconciler.start()
+    scheduler.add_job(
+        reconcile_files,
+        IntervalTrigger(seconds=settings.reconcile_interval_seconds),
+        id="reconcile_files",
+        replace_existing=True,
+        next_run_time=datetime.now(),
+    )
     scheduler.start()
     logger.info("Recording scheduler started")
 
@@ -172,5 +227,7 @@ def shutdown_scheduler():
         stop_recording(recording_id)
     
     scheduler.shutdown()
+    reconciler.stop()
+    thumbnails.shutdown()
     logger.info("Recording scheduler stopped")
 
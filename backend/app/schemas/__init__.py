@@ -1,10 +1,12 @@
 from app.schemas.channel import ChannelCreate, ChannelUpdate, ChannelResponse
 from app.schemas.recording import RecordingCreate, RecordingUpdate, RecordingResponse, TimeConversionResponse
-from app.schemas.recorded_file import RecordedFileResponse
+from app.schemas.recorded_file import RecordedFileResponse, FileVerificationResponse, ReconcileReport
+from app.schemas.timeline import TimelineRecording, TimelineDay, ChannelTimeline, TimelineResponse
 
 __all__ = [
     "ChannelCreate", "ChannelUpdate", "ChannelResponse",
     "RecordingCreate", "RecordingUpdate", "RecordingResponse", "TimeConversionResponse",
-    "RecordedFileResponse",
+    "RecordedFileResponse", "FileVerificationResponse", "ReconcileReport",
+    "TimelineRecording", "TimelineDay", "ChannelTimeline", "TimelineResponse",
 ]
 
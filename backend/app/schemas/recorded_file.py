@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
 from app.schemas.recording import RecordingResponse
 
@@ -14,9 +14,50 @@ class RecordedFileBase(BaseModel):
 class RecordedFileResponse(RecordedFileBase):
     id: UUID
     recording_id: UUID
+    checksum_sha256: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    bitrate: Optional[int] = None
+    continuity_errors: Optional[int] = None
+    pcr_discontinuities: Optional[int] = None
+    verified_at: Optional[datetime] = None
+    missing_at: Optional[datetime] = None
     created_at: datetime
     recording: Optional[RecordingResponse] = None
 
     class Config:
         from_attributes = True
 
+
+
+class FileVerificationResponse(BaseModel):
+    file_id: UUID
+    valid: bool
+    expected_sha256: str
+    actual_sha256: str
+    expected_size: Optional[int] = None
+    actual_size: int
+    verified_at: datetime
+
+
+class MissingFile(BaseModel):
+    id: UUID
+    file_path: str
+    missing_at: datetime
+
+
+class UntrackedFile(BaseModel):
+    file_path: str
+    file_size: int
+    modified_at: datetime
+
+
+class ReconcileReport(BaseModel):
+    watching: bool
+    last_scan_at: Optional[datetime] = None
+    last_full_sync_at: Optional[datetime] = None
+    disk_file_count: int
+    db_file_count: int
+    missing_count: int
+    untracked_count: int
+    missing_on_disk: List[MissingFile]
+    untracked_on_disk: List[UntrackedFile]
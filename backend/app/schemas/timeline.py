@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+from typing import List
+
+from app.models.recording import RecordingStatus
+
+
+class TimelineRecording(BaseModel):
+    id: UUID
+    title: str
+    status: RecordingStatus
+    utc_start_time: datetime
+    utc_end_time: datetime
+    channel_start_time: str
+    channel_end_time: str
+
+
+class TimelineDay(BaseModel):
+    date: str  # Channel-local date (YYYY-MM-DD)
+    # Every recording overlapping this day within the requested range, so a
+    # recording that crosses midnight is listed under each day it covers
+    recordings: List[TimelineRecording]
+
+
+class ChannelTimeline(BaseModel):
+    channel_id: UUID
+    channel_name: str
+    channel_timezone: str
+    days: List[TimelineDay]
+
+
+class TimelineResponse(BaseModel):
+    range_start: datetime
+    range_end: datetime
+    channels: List[ChannelTimeline]
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+NULL_PID = 0x1FFF
+PCR_CLOCK = 27_000_000
+PCR_WRAP = (1 << 33) * 300
+# PCR jumps larger than this are treated as discontinuities, not elapsed time
+MAX_PCR_GAP = 10 * PCR_CLOCK
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class IntegrityStats:
+    sha256: str
+    size: int
+    duration_seconds: Optional[float]
+    bitrate: Optional[int]
+    continuity_errors: int
+    pcr_discontinuities: int
+    sync_losses: int
+
+
+@dataclass
+class CaptureResult:
+    stats: IntegrityStats
+    error: Optional[str]
+    timed_out: bool
+
+    @property
+    def ok(self) -> bool:
+        """書き込みが最後まで成功し、統計がファイル全体を表しているか"""
+        return self.error is None and not self.timed_out
+
+
+class TSAnalyzer:
+    """MPEG-TSのストリームを逐次解析する
+
+    書き込みと同時にバイト列を受け取り、SHA-256、CCエラー数、
+    PCRから求めた再生時間を計算する。ファイルを読み直す必要はない。
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._carry = b""
+        self._cc: Dict[int, int] = {}
+        self._pcr_pid: Optional[int] = None
+        self._last_pcr: Optional[int] = None
+        self._pcr_ticks = 0
+        self.continuity_errors = 0
+        self.pcr_discontinuities = 0
+        self.sync_losses = 0
+
+    def feed(self, data: bytes):
+        self._hash.update(data)
+        self._size += len(data)
+
+        buf = self._carry + data if self._carry else data
+        view = memoryview(buf)
+        length = len(buf)
+        pos = 0
+        while pos + TS_PACKET_SIZE <= length:
+            if buf[pos] != TS_SYNC_BYTE:
+                self.sync_losses += 1
+                next_sync = buf.find(bytes([TS_SYNC_BYTE]), pos + 1)
+                if next_sync < 0:
+                    pos = length
+                    break
+                pos = next_sync
+                continue
+            self._packet(view[pos:pos + TS_PACKET_SIZE])
+            pos += TS_PACKET_SIZE
+        self._carry = bytes(view[pos:])
+
+    def _packet(self, pkt: memoryview):
+        pid = ((pkt[1] & 0x1F) << 8) | pkt[2]
+        if pid == NULL_PID:
+            return
+
+        afc = (pkt[3] >> 4) & 0x03
+        cc = pkt[3] & 0x0F
+        has_payload = afc & 0x01
+        discontinuity = False
+
+        if afc & 0x02 and pkt[4] > 0:
+            flags = pkt[5]
+            discontinuity = bool(flags & 0x80)
+            if flags & 0x10 and pkt[4] >= 7:
+                self._pcr(pid, pkt, discontinuity)
+
+        last = self._cc.get(pid)
+        if last is not None and not discontinuity:
+            if has_payload:
+                # A single duplicate packet (same CC) is permitted
+                if cc != last and cc != (last + 1) & 0x0F:
+                    self.continuity_errors += 1
+            elif cc != last:
+                self.continuity_errors += 1
+        self._cc[pid] = cc
+
+    def _pcr(self, pid: int, pkt: memoryview, discontinuity: bool):
+        if self._pcr_pid is None:
+            self._pcr_pid = pid
+        elif pid != self._pcr_pid:
+            return
+
+        base = (pkt[6] << 25) | (pkt[7] << 17) | (pkt[8] << 9) | (pkt[9] << 1) | (pkt[10] >> 7)
+        ext = ((pkt[10] & 0x01) << 8) | pkt[11]
+        pcr = base * 300 + ext
+
+        if self._last_pcr is not None:
+            delta = (pcr - self._last_pcr) % PCR_WRAP
+            if discontinuity or delta > MAX_PCR_GAP:
+                self.pcr_discontinuities += 1
+            else:
+                self._pcr_ticks += delta
+        self._last_pcr = pcr
+
+    def result(self) -> IntegrityStats:
+        duration = self._pcr_ticks / PCR_CLOCK if self._pcr_ticks else None
+        bitrate = int(self._size * 8 / duration) if duration else None
+        return IntegrityStats(
+            sha256=self._hash.hexdigest(),
+            size=self._size,
+            duration_seconds=duration,
+            bitrate=bitrate,
+            continuity_errors=self.continuity_errors,
+            pcr_discontinuities=self.pcr_discontinuities,
+            sync_losses=self.sync_losses,
+        )
+
+
+class CaptureWriter(threading.Thread):
+    """ffmpegの標準出力をファイルに書き込みながら解析するスレッド"""
+
+    def __init__(self, source: BinaryIO, output_path: str):
+        super().__init__(daemon=True)
+        self.source = source
+        self.output_path = output_path
+        self.analyzer = TSAnalyzer()
+        self.error: Optional[Exception] = None
+
+    def run(self):
+        try:
+            with open(self.output_path, "wb") as out:
+                while True:
+                    chunk = self.source.read1(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    self.analyzer.feed(chunk)
+        except Exception as e:
+            self.error = e
+            logger.error(f"Capture writer failed for {self.output_path}: {e}")
+        finally:
+            self.source.close()
+
+    def finish(self, timeout: Optional[float] = None) -> CaptureResult:
+        self.join(timeout)
+        timed_out = self.is_alive()
+        if timed_out:
+            logger.error(f"Capture writer for {self.output_path} did not finish within {timeout}s")
+        return CaptureResult(
+            stats=self.analyzer.result(),
+            error=str(self.error) if self.error is not None else None,
+            timed_out=timed_out,
+        )
+
+
+def compute_sha256(file_path: str) -> str:
+    """ファイルを先頭から一度だけ順に読み、SHA-256を計算"""
+    with open(file_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        digest = hashlib.file_digest(f, "sha256")
+    return digest.hexdigest()
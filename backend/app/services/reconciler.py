@@ -0,0 +1,373 @@
+import os
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.recorded_file import RecordedFile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RECORDING_EXTENSIONS = (".ts",)
+# Files modified within this window are re-stat'ed on every scan
+HOT_WINDOW = timedelta(minutes=10)
+# Full DB comparison only reads the DB; the disk side comes from the in-memory index
+FULL_SYNC_INTERVAL = timedelta(hours=1)
+BATCH_SIZE = 1000
+
+
+@dataclass
+class DiskFile:
+    size: int
+    mtime: float
+
+
+def _load_inotify():
+    """inotify_simpleを必要になった時点で読み込む（Linux以外ではNone）"""
+    try:
+        import inotify_simple
+    except ImportError:
+        return None
+    return inotify_simple
+
+
+class Reconciler:
+    """録画ディレクトリとDBの差分を検出・同期する
+
+    ディスク側はメモリ上のインデックスで管理し、inotifyのイベントと
+    mtimeが変化したディレクトリのみを読み直す差分スキャンで更新する。
+    DB側は変化したパスだけを照会し、ファイルサイズと欠損状態を更新する。
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.last_scan_at: Optional[datetime] = None
+        self.last_full_sync_at: Optional[datetime] = None
+        self._files: Dict[str, DiskFile] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._subdirs: Dict[str, Set[str]] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+        self._hot: Set[str] = set()
+        self._dirty: Set[str] = set()
+        # Disk files without a DB row, kept current by sync() so reports never read the whole table
+        self._untracked: Set[str] = set()
+        self._lock = threading.RLock()
+        self._inotify = None
+        self._flags = None
+        self._watches: Dict[int, str] = {}
+        self._watch_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def watching(self) -> bool:
+        return self._inotify is not None
+
+    def start(self):
+        """inotifyによる監視を開始（利用できなければ定期スキャンのみ）"""
+        os.makedirs(self.root, exist_ok=True)
+        inotify = _load_inotify()
+        if inotify is not None:
+            self._flags = inotify.flags
+            try:
+                self._inotify = inotify.INotify()
+            except OSError as e:
+                logger.warning(f"inotify unavailable, falling back to periodic scans: {e}")
+        if self._inotify is not None:
+            self._stop.clear()
+            self._watch_thread = threading.Thread(
+                target=self._watch_loop, name="reconciler-inotify", daemon=True
+            )
+            self._watch_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._watches.clear()
+
+    def run_once(self, db: Session):
+        """差分スキャンとDB同期を1回実行"""
+        self.scan()
+        self.sync(db)
+
+    # Disk side
+
+    def scan(self):
+        with self._lock:
+            self._scan_dir("")
+            self._restat_hot()
+            self.last_scan_at = datetime.utcnow()
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _scan_dir(self, rel: str):
+        try:
+            st = os.stat(self._abs(rel))
+        except FileNotFoundError:
+            self._forget_dir(rel)
+            return
+
+        if self._dir_mtimes.get(rel) != st.st_mtime_ns:
+            self._dir_mtimes[rel] = st.st_mtime_ns
+            if rel not in self._subdirs:
+                self._add_watch(rel)
+            known = self._children.get(rel, set())
+            seen: Set[str] = set()
+            subdirs: Set[str] = set()
+            with os.scandir(self._abs(rel)) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    path = os.path.join(rel, entry.name) if rel else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.add(path)
+                    elif entry.name.endswith(RECORDING_EXTENSIONS):
+                        seen.add(path)
+                        # Known files are kept current by inotify and the hot set
+                        if path not in known:
+                            self._stat_file(path)
+            for path in known - seen:
+                self._remove_file(path)
+            for sub in self._subdirs.get(rel, set()) - subdirs:
+                self._forget_dir(sub)
+            self._children[rel] = seen
+            self._subdirs[rel] = subdirs
+
+        for sub in list(self._subdirs.get(rel, ())):
+            self._scan_dir(sub)
+
+    def _forget_dir(self, rel: str):
+        for sub in self._subdirs.pop(rel, set()):
+            self._forget_dir(sub)
+        for path in self._children.pop(rel, set()):
+            self._remove_file(path)
+        self._dir_mtimes.pop(rel, None)
+
+    def _restat_hot(self):
+        for path in list(self._hot):
+            self._stat_file(path)
+
+    def _stat_file(self, path: str):
+        try:
+            st = os.stat(self._abs(path))
+        except FileNotFoundError:
+            self._remove_file(path)
+            return
+        current = self._files.get(path)
+        if current is None or current.size != st.st_size or current.mtime != st.st_mtime:
+            self._files[path] = DiskFile(size=st.st_size, mtime=st.st_mtime)
+            self._dirty.add(path)
+        self._children.setdefault(os.path.dirname(path), set()).add(path)
+        if time.time() - st.st_mtime < HOT_WINDOW.total_seconds():
+            self._hot.add(path)
+        else:
+            self._hot.discard(path)
+
+    def _remove_file(self, path: str):
+        if self._files.pop(path, None) is not None:
+            self._dirty.add(path)
+        self._hot.discard(path)
+        children = self._children.get(os.path.dirname(path))
+        if children is not None:
+            children.discard(path)
+
+    # inotify
+
+    def _add_watch(self, rel: str):
+        if self._inotify is None:
+            return
+        flags = self._flags
+        mask = (
+            flags.CREATE | flags.DELETE | flags.MOVED_FROM
+            | flags.MOVED_TO | flags.CLOSE_WRITE | flags.DELETE_SELF
+        )
+        try:
+            wd = self._inotify.add_watch(self._abs(rel), mask)
+            self._watches[wd] = rel
+        except OSError as e:
+            logger.warning(f"Failed to watch {self._abs(rel)}: {e}")
+
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            try:
+                events = self._inotify.read(timeout=1000)
+            except (OSError, ValueError):
+                break
+            if events:
+                with self._lock:
+                    for event in events:
+                        self._handle_event(event)
+
+    def _handle_event(self, event):
+        flags = self._flags
+        if event.mask & flags.Q_OVERFLOW:
+            # Events were dropped; force every directory to be listed again
+            logger.warning("inotify queue overflow, rescheduling full directory scan")
+            self._dir_mtimes.clear()
+            return
+        if event.mask & flags.IGNORED:
+            self._watches.pop(event.wd, None)
+            return
+
+        rel = self._watches.get(event.wd)
+        if rel is None or not event.name:
+            return
+        path = os.path.join(rel, event.name) if rel else event.name
+
+        if event.mask & flags.ISDIR:
+            # Picked up (and watched) by the next scan
+            self._dir_mtimes.pop(rel, None)
+            return
+        if not event.name.endswith(RECORDING_EXTENSIONS):
+            return
+
+        if event.mask & (flags.DELETE | flags.MOVED_FROM):
+            self._remove_file(path)
+        else:
+            self._stat_file(path)
+
+        # The event already accounts for this change, so avoid relisting the directory
+        try:
+            if rel in self._dir_mtimes:
+                self._dir_mtimes[rel] = os.stat(self._abs(rel)).st_mtime_ns
+        except FileNotFoundError:
+            pass
+
+    # Database side
+
+    def normalize(self, file_path: str) -> str:
+        """DBのfile_pathを録画ディレクトリからの相対パスに変換"""
+        if os.path.isabs(file_path):
+            rel = os.path.relpath(file_path, self.root)
+            if not rel.startswith(".."):
+                return rel
+        return file_path
+
+    def sync(self, db: Session):
+        now = datetime.utcnow()
+        with self._lock:
+            full = (
+                self.last_full_sync_at is None
+                or now - self.last_full_sync_at >= FULL_SYNC_INTERVAL
+            )
+            dirty = self._dirty
+            self._dirty = set()
+            if full:
+                snapshot = dict(self._files)
+            else:
+                snapshot = {path: self._files.get(path) for path in dirty}
+
+        try:
+            if full:
+                rows = self._all_rows(db)
+            else:
+                rows = self._rows_for(db, dirty)
+            tracked: Set[str] = set()
+            updates = list(self._diff(rows, snapshot, now, tracked))
+            for i in range(0, len(updates), BATCH_SIZE):
+                db.execute(update(RecordedFile), updates[i:i + BATCH_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty |= dirty
+            raise
+
+        with self._lock:
+            if full:
+                self._untracked = set(snapshot) - tracked
+            else:
+                for path in dirty:
+                    if path in tracked or path not in self._files:
+                        self._untracked.discard(path)
+                    else:
+                        self._untracked.add(path)
+
+        if full:
+            self.last_full_sync_at = now
+        if updates:
+            logger.info(f"Reconciled {len(updates)} recorded file(s)")
+
+    def _all_rows(self, db: Session) -> Iterable[Tuple]:
+        return (
+            db.query(
+                RecordedFile.id,
+                RecordedFile.file_path,
+                RecordedFile.file_size,
+                RecordedFile.missing_at,
+            )
+            .yield_per(BATCH_SIZE)
+        )
+
+    def _rows_for(self, db: Session, paths: Set[str]) -> Iterable[Tuple]:
+        candidates = []
+        for path in paths:
+            candidates.append(path)
+            candidates.append(self._abs(path))
+        for i in range(0, len(candidates), BATCH_SIZE):
+            yield from (
+                db.query(
+                    RecordedFile.id,
+                    RecordedFile.file_path,
+                    RecordedFile.file_size,
+                    RecordedFile.missing_at,
+                )
+                .filter(RecordedFile.file_path.in_(candidates[i:i + BATCH_SIZE]))
+                .all()
+            )
+
+    def _diff(
+        self,
+        rows: Iterable[Tuple],
+        snapshot: Dict[str, Optional[DiskFile]],
+        now: datetime,
+        tracked: Set[str],
+    ):
+        for file_id, file_path, file_size, missing_at in rows:
+            path = self.normalize(file_path)
+            tracked.add(path)
+            disk = snapshot.get(path)
+            if disk is None:
+                if missing_at is None:
+                    yield {"id": file_id, "missing_at": now, "file_size": file_size}
+            elif missing_at is not None or file_size != disk.size:
+                yield {"id": file_id, "missing_at": None, "file_size": disk.size}
+
+    # Report
+
+    def mark_tracked(self, file_path: str):
+        """DBに登録したファイルを未登録ファイルの一覧から外す"""
+        with self._lock:
+            self._untracked.discard(self.normalize(file_path))
+
+    def untracked_files(self, exclude: Set[str]) -> List[Tuple[str, DiskFile]]:
+        """DBに登録されていないディスク上の録画ファイル（直近の同期時点）"""
+        excluded = {self.normalize(path) for path in exclude}
+        with self._lock:
+            return sorted(
+                (
+                    (path, self._files[path])
+                    for path in self._untracked
+                    if path in self._files and path not in excluded
+                ),
+                key=lambda item: item[1].mtime,
+            )
+
+    def disk_file_count(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+
+reconciler = Reconciler(settings.recordings_path)
@@ -0,0 +1,54 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.recording import Recording
+
+# Rows written outside the API (e.g. directly in the DB) are picked up after this many seconds
+REFRESH_INTERVAL = 300
+
+_lock = threading.Lock()
+_max_duration: Optional[timedelta] = None
+_loaded_at = 0.0
+
+
+def _query_max_duration(db: Session) -> timedelta:
+    if db.get_bind().dialect.name == "sqlite":
+        days = db.query(
+            func.max(func.julianday(Recording.end_time) - func.julianday(Recording.start_time))
+        ).scalar()
+        return timedelta(days=days or 0)
+    return db.query(func.max(Recording.end_time - Recording.start_time)).scalar() or timedelta(0)
+
+
+def max_recording_duration(db: Session) -> timedelta:
+    """保存されている録画の最長時間（期間検索で開始時刻の下限を決めるのに使う）"""
+    global _max_duration, _loaded_at
+    with _lock:
+        if _max_duration is not None and time.monotonic() - _loaded_at < REFRESH_INTERVAL:
+            return _max_duration
+    duration = _query_max_duration(db)
+    with _lock:
+        # A concurrent note_duration() may have raised the value in the meantime
+        _max_duration = max(duration, _max_duration or timedelta(0))
+        _loaded_at = time.monotonic()
+        return _max_duration
+
+
+def note_duration(duration: timedelta):
+    """作成・更新する録画の長さを反映（コミット前に呼ぶ）"""
+    global _max_duration
+    with _lock:
+        if _max_duration is not None and duration > _max_duration:
+            _max_duration = duration
+
+
+def reset():
+    global _max_duration, _loaded_at
+    with _lock:
+        _max_duration = None
+        _loaded_at = 0.0
@@ -0,0 +1,327 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THUMBNAIL_WIDTH = 320
+SPRITE_TILE_WIDTH = 160
+SPRITE_TILE_HEIGHT = 90
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+FFMPEG_TIMEOUT = 120
+# Separate pools so slow sprite renders (one ffmpeg per tile) never hold up thumbnails
+THUMBNAIL_WORKERS = 2
+SPRITE_WORKERS = 1
+# Failed renders are not retried for this long (seconds)
+FAILURE_TTL = 600
+
+
+class ThumbnailError(Exception):
+    pass
+
+
+class ThumbnailCache:
+    """サイズ上限付きのサムネイルキャッシュ（LRUで削除）
+
+    アクセス順はファイルのmtimeにも反映するため、再起動後もLRU順が保たれる。
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith("."):
+                    st = entry.stat()
+                    found.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._loaded = True
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            self._load()
+            if name not in self._entries:
+                return None
+            path = self.path_for(name)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(name)
+                return None
+            self._entries.move_to_end(name)
+            return path
+
+    def read(self, name: str) -> Optional[bytes]:
+        """キャッシュ済みの画像を読み込む（LRUで削除済みならNone）"""
+        path = self.get(name)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by a concurrent put between get() and open()
+            with self._lock:
+                if name in self._entries:
+                    self._total_bytes -= self._entries.pop(name)
+            return None
+
+    def put(self, name: str, source_path: str) -> str:
+        """生成済みファイルをキャッシュに移動し、上限を超えた分を古い順に削除"""
+        with self._lock:
+            self._load()
+            path = self.path_for(name)
+            os.replace(source_path, path)
+            size = os.path.getsize(path)
+            if name in self._entries:
+                self._total_bytes -= self._entries.pop(name)
+            self._entries[name] = size
+            self._total_bytes += size
+            self._evict(keep=name)
+            return path
+
+    def discard(self, prefix: str):
+        with self._lock:
+            self._load()
+            for name in [n for n in self._entries if n.startswith(prefix)]:
+                self._remove(name)
+
+    def _evict(self, keep: str):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+
+    def _remove(self, name: str):
+        self._total_bytes -= self._entries.pop(name)
+        try:
+            os.remove(self.path_for(name))
+        except FileNotFoundError:
+            pass
+
+
+cache = ThumbnailCache(settings.thumbnails_path, settings.thumbnail_cache_max_bytes)
+# Created on first use so importing this module does not start a pool
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+_pending: Dict[str, Future] = {}
+_failures: Dict[str, float] = {}
+_state_lock = threading.Lock()
+
+
+def thumbnail_name(file_id: UUID) -> str:
+    return f"{file_id}_thumb.jpg"
+
+
+def sprite_name(file_id: UUID) -> str:
+    return f"{file_id}_sprite.jpg"
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """ffprobeで動画の長さ（秒）を取得"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        video_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        return float(result.stdout.strip())
+    except (subprocess.SubprocessError, ValueError, OSError):
+        return None
+
+
+def _run_ffmpeg(cmd: list, output_path: str):
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=FFMPEG_TIMEOUT,
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        raise ThumbnailError(str(e)) from e
+    if result.returncode != 0 or not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        raise ThumbnailError(result.stderr.decode(errors="replace")[-500:])
+
+
+def _grab_frame(video_path: str, offset: float, vf: str, output_path: str):
+    # -ss before -i seeks in the demuxer, so only data around the offset is read
+    cmd = [
+        "ffmpeg", "-y",
+        "-ss", f"{offset:.2f}",
+        "-i", video_path,
+        "-an",
+        "-frames:v", "1",
+        "-vf", vf,
+        "-q:v", "4",
+        output_path,
+    ]
+    _run_ffmpeg(cmd, output_path)
+
+
+def _render_thumbnail(video_path: str, output_path: str):
+    duration = probe_duration(video_path)
+    offset = duration * 0.1 if duration else 0
+    _grab_frame(video_path, offset, f"scale={THUMBNAIL_WIDTH}:-2", output_path)
+
+
+def _render_sprite(video_path: str, output_path: str):
+    """シークプレビュー用のスプライトシート（SPRITE_COLUMNS x SPRITE_ROWS）を生成
+
+    タイルごとに入力側でシークして1フレームだけ取り出すため、
+    長時間の録画でもファイル全体を読み込まない。
+    """
+    duration = probe_duration(video_path)
+    if not duration:
+        raise ThumbnailError("Could not determine duration")
+    frames = SPRITE_COLUMNS * SPRITE_ROWS
+    w, h = SPRITE_TILE_WIDTH, SPRITE_TILE_HEIGHT
+    tile_vf = (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"
+    )
+
+    with tempfile.TemporaryDirectory(dir=cache.directory, prefix=".sprite_") as workdir:
+        previous = None
+        for i in range(frames):
+            tile_path = os.path.join(workdir, f"{i:03d}.jpg")
+            try:
+                _grab_frame(video_path, duration * (i + 0.5) / frames, tile_vf, tile_path)
+            except ThumbnailError:
+                # Keep the grid complete if a single seek fails (e.g. a corrupt segment)
+                if previous is None:
+                    raise
+                shutil.copyfile(previous, tile_path)
+            previous = tile_path
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-framerate", "1",
+            "-i", os.path.join(workdir, "%03d.jpg"),
+            "-vf", f"tile={SPRITE_COLUMNS}x{SPRITE_ROWS}",
+            "-frames:v", "1",
+            "-q:v", "5",
+            output_path,
+        ]
+        _run_ffmpeg(cmd, output_path)
+
+
+def _render(name: str, video_path: str, render):
+    os.makedirs(cache.directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".jpg", dir=cache.directory)
+    os.close(fd)
+    try:
+        render(video_path, tmp_path)
+        cache.put(name, tmp_path)
+    except Exception as e:
+        logger.warning(f"Failed to generate preview {name}: {e}")
+        with _state_lock:
+            now = time.monotonic()
+            for key in [k for k, t in _failures.items() if now - t > FAILURE_TTL]:
+                del _failures[key]
+            _failures[name] = now
+        raise
+    finally:
+        with _state_lock:
+            _pending.pop(name, None)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _get_executor(queue: str) -> ThreadPoolExecutor:
+    executor = _executors.get(queue)
+    if executor is None:
+        workers = SPRITE_WORKERS if queue == "sprite" else THUMBNAIL_WORKERS
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"previews-{queue}")
+        _executors[queue] = executor
+    return executor
+
+
+def _submit(name: str, video_path: str, render, queue: str) -> Future:
+    with _state_lock:
+        future = _pending.get(name)
+        if future is None:
+            future = _get_executor(queue).submit(_render, name, video_path, render)
+            _pending[name] = future
+        return future
+
+
+def _request(name: str, video_path: str, render, queue: str) -> Optional[bytes]:
+    """キャッシュ済みの画像を返す。未生成なら生成を予約してNoneを返す"""
+    data = cache.read(name)
+    if data is not None:
+        return data
+
+    with _state_lock:
+        failed_at = _failures.get(name)
+    if failed_at is not None and time.monotonic() - failed_at < FAILURE_TTL:
+        raise ThumbnailError("Preview generation failed recently")
+
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(video_path)
+
+    _submit(name, video_path, render, queue)
+    return None
+
+
+def get_thumbnail(file_id: UUID, video_path: str) -> Optional[bytes]:
+    """サムネイルを取得（未生成ならバックグラウンドで生成してNone）"""
+    return _request(thumbnail_name(file_id), video_path, _render_thumbnail, "thumbnail")
+
+
+def get_sprite(file_id: UUID, video_path: str) -> Optional[bytes]:
+    """スプライトシートを取得（未生成ならバックグラウンドで生成してNone）"""
+    return _request(sprite_name(file_id), video_path, _render_sprite, "sprite")
+
+
+def schedule_generation(file_id: UUID, video_path: str):
+    """録画完了後にサムネイルとスプライトシートをバックグラウンドで生成"""
+    _submit(thumbnail_name(file_id), video_path, _render_thumbnail, "thumbnail")
+    _submit(sprite_name(file_id), video_path, _render_sprite, "sprite")
+
+
+def discard(file_id: UUID):
+    """ファイルに紐づくキャッシュを削除"""
+    cache.discard(str(file_id))
+    with _state_lock:
+        for name in (thumbnail_name(file_id), sprite_name(file_id)):
+            _failures.pop(name, None)
+
+
+def shutdown():
+    with _state_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
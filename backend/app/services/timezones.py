@@ -0,0 +1,22 @@
+from datetime import datetime
+from functools import lru_cache
+
+import pytz
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> pytz.BaseTzInfo:
+    """pytzのタイムゾーンを取得（解決結果をキャッシュ）"""
+    return pytz.timezone(name)
+
+
+def as_utc(value: datetime) -> datetime:
+    """naiveな日時はUTCとみなし、UTCのaware日時に変換"""
+    if value.tzinfo is None:
+        return pytz.UTC.localize(value)
+    return value.astimezone(pytz.UTC)
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """DB比較用にUTCのnaive日時に変換"""
+    return as_utc(value).replace(tzinfo=None)
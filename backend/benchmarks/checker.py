@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from benchmarks.common import QueryCounter
+from benchmarks.seed import seed_due_recordings
+
+
+class CheckRecordingsLoop:
+    """APIサーバーと同じプロセスでcheck_recordingsを繰り返し実行して計測する
+
+    ルーターと同じエンジン（コネクションプール）を使うため、API負荷との競合が結果に含まれる。
+    ffmpegは起動せず、実行ごとに開始・停止対象の録画を作り直す。
+    """
+
+    def __init__(self, engine: Engine, due: int):
+        self.engine = engine
+        self.due = due
+        self.samples: List[Tuple[float, int]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, runs: Optional[int] = None):
+        """runsを指定しなければstop()まで繰り返す"""
+        self.samples = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(runs,), name="bench-check-recordings", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[Tuple[float, int]]:
+        """実行中の回が終わるのを待ち、計測結果（秒, SQL実行数）を返す"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def wait(self) -> List[Tuple[float, int]]:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def _run(self, runs: Optional[int]):
+        from sqlalchemy.orm import Session
+
+        from app import scheduler
+        from app.models import Channel
+        from app.services.integrity import CaptureResult, TSAnalyzer
+
+        # Stand-ins for ffmpeg so the run measures only the scheduler's database work
+        def start_recording(recording_id, m3u8_url, output_path):
+            return True
+
+        def stop_recording(recording_id):
+            return CaptureResult(stats=TSAnalyzer().result(), error=None, timed_out=False)
+
+        with Session(self.engine) as db:
+            channel_ids = [row[0] for row in db.query(Channel.id)]
+
+        original = scheduler.start_recording, scheduler.stop_recording
+        scheduler.start_recording, scheduler.stop_recording = start_recording, stop_recording
+        try:
+            run = 0
+            while not self._stop.is_set() and (runs is None or run < runs):
+                # check_recordings changes their status, so every run gets fresh due rows
+                seed_due_recordings(self.engine, channel_ids, self.due, random_seed=run)
+                with QueryCounter() as queries:
+                    started = time.perf_counter()
+                    scheduler.check_recordings()
+                    elapsed = time.perf_counter() - started
+                self.samples.append((elapsed, queries.count))
+                run += 1
+        finally:
+            scheduler.start_recording, scheduler.stop_recording = original
@@ -0,0 +1,65 @@
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+
+QUERY_COUNT_HEADER = "x-query-count"
+
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    # Lets the PostgreSQL models run against a SQLite stand-in
+    return "CHAR(32)"
+
+
+def install_query_counter(engine: Engine):
+    """エンジンで実行されたSQLを現在のコンテキストのカウンタに加算"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+class QueryCounter:
+    """with文の間に実行されたSQLの数を数える"""
+
+    def __enter__(self):
+        self.counter = [0]
+        self._token = _query_counter.set(self.counter)
+        return self
+
+    def __exit__(self, *exc):
+        _query_counter.reset(self._token)
+
+    @property
+    def count(self) -> int:
+        return self.counter[0]
+
+
+class QueryCountMiddleware:
+    """リクエストごとのSQL実行数をレスポンスヘッダーに付与するASGIミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with QueryCounter() as queries:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.encode(), str(queries.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,311 @@
+"""APIとDBのスケールベンチマーク
+
+大量のChannel/Recording/RecordedFileを作成し、一覧・詳細・ダウンロード・作成の
+各エンドポイントに並列で負荷をかけ、開始・停止対象の録画を含むcheck_recordingsを
+（ffmpegを起動せずに）繰り返し実行して、レイテンシ（p50/p95/p99）、
+スループット、1リクエストあたりのSQL実行数を出力する。
+
+    cd backend
+    python -m benchmarks.run                                    # SQLite (一時ディレクトリ)
+    python -m benchmarks.run --database-url postgresql://...    # ローカルのPostgreSQL
+
+指定したDBのテーブルは作り直されるため、本番のDBは指定しないこと。
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[random.Random], str]
+    requests: int
+    body: Optional[Callable[[random.Random], dict]] = None
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    queries_per_request: float
+    max_queries: int
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="M3U8 Recorder API/DB benchmark")
+    parser.add_argument("--database-url", help="Benchmark database (tables are dropped). Default: SQLite in a temp dir")
+    parser.add_argument("--channels", type=int, default=300)
+    parser.add_argument("--recordings", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=100_000, help="Upper bound; only completed recordings get a file")
+    parser.add_argument("--workdir", help="Directory for the SQLite database and recordings. Default: a new temp dir")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database (and --workdir)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per detail/create/download scenario")
+    parser.add_argument("--list-requests", type=int, default=10, help="Requests per unpaginated list scenario")
+    parser.add_argument("--check-runs", type=int, default=20, help="Sequential check_recordings runs")
+    parser.add_argument(
+        "--due-recordings", type=int, default=50,
+        help="Recordings to start and to stop in each check_recordings run (each)",
+    )
+    parser.add_argument("--download-files", type=int, default=20)
+    parser.add_argument("--download-size", type=int, default=1024 * 1024)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--only", nargs="*", help="Run only these scenarios")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(name: str, samples: List[Tuple[float, int, bool]], elapsed: float) -> Result:
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[1] for s in samples if s[2]]
+    return Result(
+        name=name,
+        requests=len(samples),
+        errors=sum(1 for s in samples if not s[2]),
+        throughput=len(samples) / elapsed if elapsed else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        max_ms=latencies[-1] if latencies else 0.0,
+        queries_per_request=statistics.mean(queries) if queries else 0.0,
+        max_queries=max(queries) if queries else 0,
+    )
+
+
+def request(base_url: str, method: str, path: str, body: Optional[dict]) -> Tuple[float, int, bool]:
+    from benchmarks.common import QUERY_COUNT_HEADER
+
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        base_url + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"} if data else {},
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=300) as res:
+            while res.read(1024 * 1024):
+                pass
+            queries = int(res.headers.get(QUERY_COUNT_HEADER, 0))
+            ok = True
+    except (urllib.error.URLError, OSError) as e:
+        headers = getattr(e, "headers", None)
+        queries = int(headers.get(QUERY_COUNT_HEADER, 0)) if headers else 0
+        ok = False
+    return time.perf_counter() - started, queries, ok
+
+
+def run_scenario(base_url: str, scenario: Scenario, concurrency: int, rng: random.Random) -> Result:
+    calls = [
+        (scenario.path(rng), scenario.body(rng) if scenario.body else None)
+        for _ in range(scenario.requests)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda call: request(base_url, scenario.method, *call), calls))
+    return summarize(scenario.name, samples, time.perf_counter() - started)
+
+
+def post_json(base_url: str, path: str) -> dict:
+    req = urllib.request.Request(base_url + path, data=b"", method="POST")
+    with urllib.request.urlopen(req, timeout=3600) as res:
+        return json.loads(res.read())
+
+
+def check_result(name: str, samples: List[List[float]], elapsed: float) -> Result:
+    return summarize(name, [(seconds, int(queries), True) for seconds, queries in samples], elapsed)
+
+
+def run_check_recordings(base_url: str, runs: int) -> Result:
+    """APIに負荷をかけない状態でcheck_recordingsをruns回実行"""
+    post_json(base_url, f"/bench/check-recordings/start?runs={runs}")
+    samples = post_json(base_url, "/bench/check-recordings/stop?wait=true")["samples"]
+    # Reseeding between runs is not part of the measurement
+    return check_result("check_recordings", samples, sum(seconds for seconds, _ in samples))
+
+
+def build_scenarios(ids, args) -> List[Scenario]:
+    from benchmarks.seed import CREATED_TITLE
+
+    def pick(values):
+        return lambda rng: rng.choice(values)
+
+    channel = pick(ids.channel_ids)
+    recording = pick(ids.recording_ids)
+
+    def week(rng: random.Random) -> str:
+        start = datetime.utcnow() - timedelta(days=rng.randint(0, 300))
+        end = start + timedelta(days=7)
+        return f"/api/timeline?from={start:%Y-%m-%dT%H:%M:%S}&to={end:%Y-%m-%dT%H:%M:%S}"
+
+    def new_recording(rng: random.Random) -> dict:
+        start = datetime.utcnow() + timedelta(days=60, minutes=rng.randint(0, 60 * 24 * 30))
+        return {
+            "channel_id": str(channel(rng)),
+            "title": CREATED_TITLE,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+        }
+
+    scenarios = [
+        Scenario("list_channels", "GET", lambda rng: "/api/channels", args.requests),
+        Scenario("list_recordings", "GET", lambda rng: "/api/recordings", args.list_requests),
+        Scenario("list_recordings_by_channel", "GET", lambda rng: f"/api/recordings?channel_id={channel(rng)}", args.requests),
+        Scenario("list_files", "GET", lambda rng: "/api/files", args.list_requests),
+        Scenario("get_recording", "GET", lambda rng: f"/api/recordings/{recording(rng)}", args.requests),
+        Scenario("convert_time", "GET", lambda rng: f"/api/recordings/{recording(rng)}/convert-time", args.requests),
+        Scenario("timeline_week", "GET", week, args.requests),
+        Scenario("create_recording", "POST", lambda rng: "/api/recordings", args.requests, body=new_recording),
+    ]
+    if ids.file_ids:
+        file = pick(ids.file_ids)
+        scenarios.append(Scenario("get_file", "GET", lambda rng: f"/api/files/{file(rng)}", args.requests))
+    if ids.downloadable_file_ids:
+        downloadable = pick(ids.downloadable_file_ids)
+        scenarios.append(Scenario("download_file", "GET", lambda rng: f"/api/files/{downloadable(rng)}/download", args.requests))
+    return scenarios
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.server:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--lifespan", "off",
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Benchmark server did not start in time")
+
+
+def print_results(results: List[Result]):
+    header = f"{'scenario':<28}{'reqs':>6}{'err':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'q/req':>7}{'max q':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.name:<28}{r.requests:>6}{r.errors:>5}{r.throughput:>9.1f}"
+            f"{r.p50_ms:>9.1f}{r.p95_ms:>9.1f}{r.p99_ms:>9.1f}{r.max_ms:>9.1f}"
+            f"{r.queries_per_request:>7.1f}{r.max_queries:>7}"
+        )
+
+
+def main():
+    args = parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="m3u8_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    recordings_path = os.path.join(workdir, "recordings")
+
+    # The app reads its settings at import time, so configure them before importing it
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["RECORDINGS_PATH"] = recordings_path
+    os.environ["THUMBNAILS_PATH"] = os.path.join(workdir, "thumbnails")
+    sys.path.insert(0, BACKEND_DIR)
+
+    import benchmarks.common  # noqa: F401  (registers the SQLite UUID type before models are used)
+    from benchmarks.seed import seed, load_ids, delete_created_recordings
+    from app.database import engine
+
+    if args.skip_seed:
+        ids = load_ids(engine, recordings_path)
+    else:
+        print(f"Seeding {args.channels} channels, {args.recordings} recordings, up to {args.files} files ...")
+        t0 = time.perf_counter()
+        ids = seed(
+            engine,
+            channels=args.channels,
+            recordings=args.recordings,
+            files=args.files,
+            recordings_path=recordings_path,
+            download_files=args.download_files,
+            download_size=args.download_size,
+        )
+        print(f"Seeded {len(ids.file_ids)} files in {time.perf_counter() - t0:.1f} s")
+
+    scenarios = build_scenarios(ids, args)
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in args.only]
+
+    rng = random.Random(0)
+    results: List[Result] = []
+    run_check = not args.only or "check_recordings" in args.only
+    # Measured again while the API scenarios run, as the real scheduler shares the process
+    check_under_load = run_check and bool(scenarios)
+    env = dict(os.environ, BENCH_DUE_RECORDINGS=str(args.due_recordings))
+    delete_created_recordings(engine)
+    server = start_server(args.port, env)
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        if run_check:
+            print("Running check_recordings ...", flush=True)
+            results.append(run_check_recordings(base_url, args.check_runs))
+        if check_under_load:
+            post_json(base_url, "/bench/check-recordings/start")
+        load_started = time.perf_counter()
+        for scenario in scenarios:
+            print(f"Running {scenario.name} ...", flush=True)
+            results.append(run_scenario(base_url, scenario, args.concurrency, rng))
+        if check_under_load:
+            samples = post_json(base_url, "/bench/check-recordings/stop")["samples"]
+            results.append(check_result("check_recordings_under_load", samples, time.perf_counter() - load_started))
+    finally:
+        server.terminate()
+        server.wait()
+        delete_created_recordings(engine)
+
+    print()
+    print(f"database: {engine.url.render_as_string(hide_password=True)}  concurrency: {args.concurrency}")
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import Channel, Recording, RecordedFile
+from app.models.recording import RecordingStatus
+
+TIMEZONES = ["UTC", "Asia/Tokyo", "America/New_York", "Europe/London", "Australia/Sydney"]
+BATCH_SIZE = 5000
+PAST_DAYS = 365
+FUTURE_DAYS = 30
+# Title of the rows created by seed_due_recordings, so they can be replaced on every run
+DUE_TITLE = "Benchmark due"
+# Title of the rows created by the create_recording scenario, removed after every run
+CREATED_TITLE = "Benchmark created"
+
+
+@dataclass
+class SeededIds:
+    channel_ids: List[UUID] = field(default_factory=list)
+    recording_ids: List[UUID] = field(default_factory=list)
+    file_ids: List[UUID] = field(default_factory=list)
+    downloadable_file_ids: List[UUID] = field(default_factory=list)
+
+
+def _insert_batches(conn, table, rows: List[dict]):
+    for i in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(table), rows[i:i + BATCH_SIZE])
+
+
+def seed(
+    engine: Engine,
+    channels: int,
+    recordings: int,
+    files: int,
+    recordings_path: str,
+    download_files: int,
+    download_size: int,
+    random_seed: int = 0,
+) -> SeededIds:
+    """ベンチマーク用のデータを作成（既存のテーブルは作り直す）
+
+    過去の録画は完了済み（一部失敗）、未来の録画は予約済みとして作成する。
+    check_recordingsが開始・停止する録画はseed_due_recordingsで作成する。
+    """
+    rng = random.Random(random_seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    ids = SeededIds()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    channel_rows = []
+    for i in range(channels):
+        channel_id = uuid.uuid4()
+        ids.channel_ids.append(channel_id)
+        channel_rows.append({
+            "id": channel_id,
+            "name": f"Channel {i:04d}",
+            "m3u8_url": f"http://example.invalid/{i}/index.m3u8",
+            "timezone": rng.choice(TIMEZONES),
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    recording_rows = []
+    file_rows = []
+    for i in range(recordings):
+        recording_id = uuid.uuid4()
+        ids.recording_ids.append(recording_id)
+        past = rng.random() < 0.9
+        if past:
+            start = now - timedelta(minutes=rng.randint(180, PAST_DAYS * 24 * 60))
+        else:
+            start = now + timedelta(minutes=rng.randint(60, FUTURE_DAYS * 24 * 60))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90, 120, 180]))
+        if not past:
+            status = RecordingStatus.SCHEDULED
+        elif rng.random() < 0.05:
+            status = RecordingStatus.FAILED
+        else:
+            status = RecordingStatus.COMPLETED
+        recording_rows.append({
+            "id": recording_id,
+            "channel_id": rng.choice(ids.channel_ids),
+            "title": f"Program {i}",
+            "start_time": start,
+            "end_time": end,
+            "status": status,
+            "created_at": start - timedelta(days=1),
+        })
+
+        if status == RecordingStatus.COMPLETED and len(file_rows) < files:
+            file_id = uuid.uuid4()
+            ids.file_ids.append(file_id)
+            file_rows.append({
+                "id": file_id,
+                "recording_id": recording_id,
+                "file_path": f"bench_{i:07d}.ts",
+                "file_size": rng.randint(500_000_000, 8_000_000_000),
+                "created_at": end,
+            })
+
+    with engine.begin() as conn:
+        _insert_batches(conn, Channel.__table__, channel_rows)
+        _insert_batches(conn, Recording.__table__, recording_rows)
+        _insert_batches(conn, RecordedFile.__table__, file_rows)
+
+    # Only a few rows get a real file on disk; the rest share the same content via hard links
+    os.makedirs(recordings_path, exist_ok=True)
+    template = os.path.join(recordings_path, ".bench_template.ts")
+    with open(template, "wb") as f:
+        f.write(os.urandom(download_size))
+    for row in file_rows[:download_files]:
+        path = os.path.join(recordings_path, row["file_path"])
+        if os.path.exists(path):
+            os.remove(path)
+        os.link(template, path)
+        ids.downloadable_file_ids.append(row["id"])
+
+    return ids
+
+
+def seed_due_recordings(engine: Engine, channel_ids: List[UUID], count: int, random_seed: int = 0):
+    """check_recordingsが処理する録画を作成（前回作成した分は削除）
+
+    開始時刻を過ぎた予約済みの録画と、終了時刻を過ぎた録画中の録画をそれぞれcount件作成する。
+    """
+    rng = random.Random(random_seed)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    rows = []
+    for status in (RecordingStatus.SCHEDULED, RecordingStatus.RECORDING):
+        for _ in range(count):
+            if status == RecordingStatus.SCHEDULED:
+                start = now - timedelta(minutes=rng.randint(1, 20))
+            else:
+                start = now - timedelta(minutes=rng.randint(61, 80))
+            rows.append({
+                "id": uuid.uuid4(),
+                "channel_id": rng.choice(channel_ids),
+                "title": DUE_TITLE,
+                "start_time": start,
+                "end_time": start + timedelta(minutes=60),
+                "status": status,
+                "created_at": start - timedelta(days=1),
+            })
+
+    due = select(Recording.id).where(Recording.title == DUE_TITLE)
+    with engine.begin() as conn:
+        conn.execute(delete(RecordedFile).where(RecordedFile.recording_id.in_(due)))
+        conn.execute(delete(Recording).where(Recording.title == DUE_TITLE))
+        _insert_batches(conn, Recording.__table__, rows)
+
+
+def delete_created_recordings(engine: Engine):
+    """create_recordingシナリオで作成した録画を削除し、データセットを元に戻す"""
+    with engine.begin() as conn:
+        conn.execute(delete(Recording).where(Recording.title == CREATED_TITLE))
+
+
+def load_ids(engine: Engine, recordings_path: str, limit: int = 10000) -> SeededIds:
+    """シード済みのDBからベンチマークに使うIDを読み込む"""
+    from sqlalchemy.orm import Session
+
+    ids = SeededIds()
+    with Session(engine) as db:
+        ids.channel_ids = [row[0] for row in db.query(Channel.id).limit(limit)]
+        ids.recording_ids = [row[0] for row in db.query(Recording.id).limit(limit)]
+        for file_id, file_path in db.query(RecordedFile.id, RecordedFile.file_path).limit(limit):
+            ids.file_ids.append(file_id)
+            if os.path.exists(os.path.join(recordings_path, file_path)):
+                ids.downloadable_file_ids.append(file_id)
+    return ids
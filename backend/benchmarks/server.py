@@ -0,0 +1,33 @@
+"""ベンチマーク用のAPIサーバー
+
+`uvicorn benchmarks.server:app --lifespan off` で起動する。スケジューラーは起動せず、
+レスポンスにSQL実行数のヘッダーを付与する。check_recordingsは /bench/check-recordings/*
+から同じプロセス内で実行し、APIと同時に負荷をかけられる。
+"""
+import os
+
+import benchmarks.common  # noqa: F401  (registers the SQLite UUID type before models are used)
+from benchmarks.checker import CheckRecordingsLoop
+from benchmarks.common import QueryCountMiddleware, install_query_counter
+
+from app.database import engine
+from app.main import app as api_app
+
+install_query_counter(engine)
+
+checker = CheckRecordingsLoop(engine, due=int(os.environ.get("BENCH_DUE_RECORDINGS", "50")))
+
+
+@api_app.post("/bench/check-recordings/start", include_in_schema=False)
+def start_check_recordings(runs: int = 0):
+    checker.start(runs or None)
+    return {"status": "started"}
+
+
+@api_app.post("/bench/check-recordings/stop", include_in_schema=False)
+def stop_check_recordings(wait: bool = False):
+    samples = checker.wait() if wait else checker.stop()
+    return {"samples": samples}
+
+
+app = QueryCountMiddleware(api_app)
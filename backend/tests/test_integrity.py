@@ -0,0 +1,131 @@
+from typing import Optional
+
+from app.services.integrity import (
+    PCR_CLOCK,
+    PCR_WRAP,
+    TS_PACKET_SIZE,
+    TSAnalyzer,
+)
+
+VIDEO_PID = 0x100
+
+
+def ts_packet(
+    pid: int = VIDEO_PID,
+    cc: int = 0,
+    pcr: Optional[int] = None,
+    discontinuity: bool = False,
+    payload: bool = True,
+) -> bytes:
+    """テスト用のTSパケット（188バイト）を組み立てる"""
+    header = bytes([0x47, (pid >> 8) & 0x1F, pid & 0xFF])
+    adaptation = b""
+    if pcr is not None or discontinuity:
+        flags = (0x80 if discontinuity else 0) | (0x10 if pcr is not None else 0)
+        field = bytes([flags])
+        if pcr is not None:
+            base, ext = divmod(pcr, 300)
+            field += bytes([
+                (base >> 25) & 0xFF,
+                (base >> 17) & 0xFF,
+                (base >> 9) & 0xFF,
+                (base >> 1) & 0xFF,
+                ((base & 0x01) << 7) | 0x7E | ((ext >> 8) & 0x01),
+                ext & 0xFF,
+            ])
+        if not payload:
+            field += b"\xff" * (TS_PACKET_SIZE - 5 - len(field))
+        adaptation = bytes([len(field)]) + field
+    afc = (0x02 if adaptation else 0) | (0x01 if payload else 0)
+    packet = header + bytes([(afc << 4) | (cc & 0x0F)]) + adaptation
+    return packet + b"\xff" * (TS_PACKET_SIZE - len(packet))
+
+
+def analyze(*chunks: bytes) -> TSAnalyzer:
+    analyzer = TSAnalyzer()
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    return analyzer
+
+
+def test_continuous_stream_has_no_errors():
+    stream = b"".join(ts_packet(cc=i) for i in range(40))
+    stats = analyze(stream).result()
+    assert stats.continuity_errors == 0
+    assert stats.sync_losses == 0
+    assert stats.size == len(stream)
+
+
+def test_cc_gap_is_counted():
+    stream = ts_packet(cc=0) + ts_packet(cc=1) + ts_packet(cc=3) + ts_packet(cc=4)
+    assert analyze(stream).result().continuity_errors == 1
+
+
+def test_cc_wraps_and_allows_single_duplicate():
+    stream = ts_packet(cc=14) + ts_packet(cc=15) + ts_packet(cc=15) + ts_packet(cc=0)
+    assert analyze(stream).result().continuity_errors == 0
+
+
+def test_cc_without_payload_must_not_advance():
+    stream = ts_packet(cc=5) + ts_packet(cc=5, pcr=0, payload=False) + ts_packet(cc=6, pcr=0, payload=False)
+    assert analyze(stream).result().continuity_errors == 1
+
+
+def test_cc_jump_with_discontinuity_flag_is_allowed():
+    stream = ts_packet(cc=0) + ts_packet(cc=9, discontinuity=True) + ts_packet(cc=10)
+    assert analyze(stream).result().continuity_errors == 0
+
+
+def test_cc_is_tracked_per_pid():
+    stream = ts_packet(pid=0x100, cc=0) + ts_packet(pid=0x101, cc=7) + ts_packet(pid=0x100, cc=1)
+    assert analyze(stream).result().continuity_errors == 0
+
+
+def test_duration_from_pcr():
+    stream = b"".join(ts_packet(cc=i, pcr=i * PCR_CLOCK) for i in range(11))
+    stats = analyze(stream).result()
+    assert stats.duration_seconds == 10
+    assert stats.bitrate == int(len(stream) * 8 / 10)
+    assert stats.pcr_discontinuities == 0
+
+
+def test_pcr_wraparound_counts_as_elapsed_time():
+    start = PCR_WRAP - PCR_CLOCK
+    stream = (
+        ts_packet(cc=0, pcr=start)
+        + ts_packet(cc=1, pcr=(start + PCR_CLOCK) % PCR_WRAP)
+        + ts_packet(cc=2, pcr=(start + 2 * PCR_CLOCK) % PCR_WRAP)
+    )
+    stats = analyze(stream).result()
+    assert stats.duration_seconds == 2
+    assert stats.pcr_discontinuities == 0
+
+
+def test_pcr_jump_and_discontinuity_flag_are_not_counted_as_duration():
+    stream = (
+        ts_packet(cc=0, pcr=0)
+        + ts_packet(cc=1, pcr=PCR_CLOCK)
+        + ts_packet(cc=2, pcr=PCR_CLOCK * 3600)
+        + ts_packet(cc=3, pcr=PCR_CLOCK * 3601)
+        + ts_packet(cc=4, pcr=PCR_CLOCK * 100, discontinuity=True)
+        + ts_packet(cc=5, pcr=PCR_CLOCK * 101)
+    )
+    stats = analyze(stream).result()
+    assert stats.pcr_discontinuities == 2
+    assert stats.duration_seconds == 3
+
+
+def test_packets_split_across_chunks():
+    stream = b"".join(ts_packet(cc=i, pcr=i * PCR_CLOCK) for i in range(6))
+    chunks = [stream[i:i + 100] for i in range(0, len(stream), 100)]
+    stats = analyze(*chunks).result()
+    assert stats.continuity_errors == 0
+    assert stats.duration_seconds == 5
+    assert stats.size == len(stream)
+
+
+def test_resync_after_garbage():
+    stream = ts_packet(cc=0) + b"\x00" * 50 + ts_packet(cc=1) + ts_packet(cc=2)
+    stats = analyze(stream).result()
+    assert stats.sync_losses == 1
+    assert stats.continuity_errors == 0
@@ -0,0 +1,179 @@
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import Channel, RecordedFile, Recording
+from app.services.reconciler import Reconciler
+
+
+def write(root, rel: str, size: int) -> str:
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\x47" * size)
+    return path
+
+
+def add_file(db, file_path: str, file_size=None) -> RecordedFile:
+    channel = Channel(name="ch", m3u8_url="http://example.com/live.m3u8")
+    now = datetime.utcnow()
+    recording = Recording(channel=channel, title="rec", start_time=now, end_time=now + timedelta(hours=1))
+    recorded = RecordedFile(recording=recording, file_path=file_path, file_size=file_size)
+    db.add(recorded)
+    db.commit()
+    return recorded
+
+
+def refresh(db, *rows):
+    for row in rows:
+        db.refresh(row)
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "recordings")
+
+
+@pytest.fixture
+def reconciler(root):
+    os.makedirs(root)
+    return Reconciler(root)
+
+
+def test_first_run_syncs_sizes_and_missing_files(db, root, reconciler):
+    write(root, "a.ts", 100)
+    present = add_file(db, "a.ts")
+    gone = add_file(db, "b.ts", file_size=50)
+
+    reconciler.run_once(db)
+    refresh(db, present, gone)
+
+    assert present.file_size == 100
+    assert present.missing_at is None
+    assert gone.missing_at is not None
+    assert gone.file_size == 50
+    assert reconciler.disk_file_count() == 1
+
+
+def test_incremental_run_picks_up_changes(db, root, reconciler):
+    write(root, "a.ts", 100)
+    recorded = add_file(db, "a.ts")
+    reconciler.run_once(db)
+
+    # Growing file: recently modified files are re-stat'ed on every scan
+    write(root, "a.ts", 300)
+    reconciler.run_once(db)
+    refresh(db, recorded)
+    assert recorded.file_size == 300
+
+    os.remove(os.path.join(root, "a.ts"))
+    reconciler.run_once(db)
+    refresh(db, recorded)
+    assert recorded.missing_at is not None
+
+    write(root, "a.ts", 300)
+    reconciler.run_once(db)
+    refresh(db, recorded)
+    assert recorded.missing_at is None
+
+
+def test_incremental_run_only_queries_dirty_paths(db, root, reconciler, monkeypatch):
+    write(root, "a.ts", 100)
+    add_file(db, "a.ts")
+    reconciler.run_once(db)
+
+    queried = []
+    original = Reconciler._rows_for
+    monkeypatch.setattr(
+        Reconciler, "_rows_for",
+        lambda self, db, paths: queried.append(set(paths)) or original(self, db, paths),
+    )
+    monkeypatch.setattr(Reconciler, "_all_rows", lambda self, db: pytest.fail("unexpected full sync"))
+
+    reconciler.run_once(db)
+    write(root, "sub/b.ts", 10)
+    reconciler.run_once(db)
+
+    assert queried == [set(), {os.path.join("sub", "b.ts")}]
+
+
+def test_absolute_db_paths_are_normalized(db, root, reconciler):
+    path = write(root, "nested/a.ts", 42)
+    recorded = add_file(db, path)
+
+    reconciler.run_once(db)
+    refresh(db, recorded)
+
+    assert recorded.file_size == 42
+    assert recorded.missing_at is None
+
+
+def test_removed_directory_marks_files_missing(db, root, reconciler):
+    write(root, "day1/a.ts", 10)
+    write(root, "day1/deep/b.ts", 10)
+    a = add_file(db, os.path.join("day1", "a.ts"))
+    b = add_file(db, os.path.join("day1", "deep", "b.ts"))
+    reconciler.run_once(db)
+
+    for rel in ("day1/deep/b.ts", "day1/a.ts"):
+        os.remove(os.path.join(root, rel))
+    os.rmdir(os.path.join(root, "day1", "deep"))
+    os.rmdir(os.path.join(root, "day1"))
+    reconciler.run_once(db)
+    refresh(db, a, b)
+
+    assert a.missing_at is not None
+    assert b.missing_at is not None
+    assert reconciler.disk_file_count() == 0
+
+
+def test_untracked_files_excludes_tracked_and_active(db, root, reconciler):
+    write(root, "tracked.ts", 1)
+    write(root, "active.ts", 1)
+    write(root, "orphan.ts", 1)
+    write(root, "notes.txt", 1)
+    add_file(db, "tracked.ts")
+    reconciler.run_once(db)
+
+    untracked = reconciler.untracked_files(exclude={os.path.join(root, "active.ts")})
+
+    assert [path for path, _ in untracked] == ["orphan.ts"]
+
+
+def test_untracked_files_follow_incremental_syncs(db, root, reconciler, monkeypatch):
+    reconciler.run_once(db)
+    monkeypatch.setattr(Reconciler, "_all_rows", lambda self, db: pytest.fail("unexpected full sync"))
+
+    write(root, "new.ts", 1)
+    write(root, "recorded.ts", 1)
+    reconciler.run_once(db)
+    assert sorted(path for path, _ in reconciler.untracked_files(exclude=set())) == ["new.ts", "recorded.ts"]
+
+    # A row added by the scheduler is reflected immediately
+    add_file(db, "recorded.ts")
+    reconciler.mark_tracked(os.path.join(root, "recorded.ts"))
+    assert [path for path, _ in reconciler.untracked_files(exclude=set())] == ["new.ts"]
+
+    os.remove(os.path.join(root, "new.ts"))
+    reconciler.run_once(db)
+    assert reconciler.untracked_files(exclude=set()) == []
+
+
+def test_inotify_overflow_forces_relisting(db, root, reconciler):
+    flags = pytest.importorskip("inotify_simple").flags
+
+    write(root, "a.ts", 1)
+    reconciler.run_once(db)
+
+    # The CREATE event for b.ts is lost, but the directory mtime was already recorded
+    write(root, "b.ts", 1)
+    reconciler._dir_mtimes[""] = os.stat(root).st_mtime_ns
+    reconciler.run_once(db)
+    assert reconciler.disk_file_count() == 1
+
+    reconciler._flags = flags
+    reconciler._handle_event(SimpleNamespace(wd=1, mask=flags.Q_OVERFLOW, cookie=0, name=""))
+    reconciler.run_once(db)
+    assert reconciler.disk_file_count() == 2
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.services import thumbnails
+from app.services.thumbnails import ThumbnailCache
+
+
+def make_image(tmp_path, name: str, size: int) -> str:
+    path = tmp_path / f"src_{name}"
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(str(tmp_path / "cache"), max_bytes=250)
+
+
+def test_put_and_read(tmp_path, cache):
+    cache.put("a.jpg", make_image(tmp_path, "a", 100))
+    assert cache.read("a.jpg") == b"x" * 100
+    assert cache.read("missing.jpg") is None
+
+
+def test_put_evicts_least_recently_used(tmp_path, cache):
+    cache.put("a.jpg", make_image(tmp_path, "a", 100))
+    cache.put("b.jpg", make_image(tmp_path, "b", 100))
+    # Reading a makes b the oldest entry
+    assert cache.read("a.jpg") is not None
+    cache.put("c.jpg", make_image(tmp_path, "c", 100))
+
+    assert cache.read("b.jpg") is None
+    assert not os.path.exists(cache.path_for("b.jpg"))
+    assert cache.read("a.jpg") is not None
+    assert cache.read("c.jpg") is not None
+
+
+def test_put_replaces_existing_entry_size(tmp_path, cache):
+    cache.put("a.jpg", make_image(tmp_path, "a", 100))
+    cache.put("a.jpg", make_image(tmp_path, "a2", 200))
+    cache.put("b.jpg", make_image(tmp_path, "b", 50))
+
+    assert cache.read("a.jpg") == b"x" * 200
+    assert cache.read("b.jpg") is not None
+
+
+def test_read_after_concurrent_removal_is_a_miss(tmp_path, cache):
+    cache.put("a.jpg", make_image(tmp_path, "a", 100))
+    os.remove(cache.path_for("a.jpg"))
+
+    assert cache.read("a.jpg") is None
+    # The stale entry no longer counts towards the size limit
+    cache.put("b.jpg", make_image(tmp_path, "b", 200))
+    assert cache.read("b.jpg") is not None
+
+
+def test_read_when_evicted_between_get_and_open(tmp_path, cache, monkeypatch):
+    cache.put("a.jpg", make_image(tmp_path, "a", 100))
+    original_get = ThumbnailCache.get
+
+    def get_then_evict(self, name):
+        path = original_get(self, name)
+        with self._lock:
+            self._remove(name)
+        return path
+
+    monkeypatch.setattr(ThumbnailCache, "get", get_then_evict)
+    assert cache.read("a.jpg") is None
+
+
+def test_load_restores_lru_order_from_mtime(tmp_path, cache):
+    cache.put("old.jpg", make_image(tmp_path, "old", 100))
+    cache.put("new.jpg", make_image(tmp_path, "new", 100))
+    os.utime(cache.path_for("old.jpg"), (1, 1))
+    os.utime(cache.path_for("new.jpg"), (2, 2))
+
+    reloaded = ThumbnailCache(cache.directory, max_bytes=250)
+    reloaded.put("third.jpg", make_image(tmp_path, "third", 100))
+
+    assert reloaded.read("old.jpg") is None
+    assert reloaded.read("new.jpg") is not None
+
+
+def test_discard_removes_entries_for_file(tmp_path, cache):
+    cache.put("abc_thumb.jpg", make_image(tmp_path, "t", 10))
+    cache.put("abc_sprite.jpg", make_image(tmp_path, "s", 10))
+    cache.put("def_thumb.jpg", make_image(tmp_path, "d", 10))
+
+    cache.discard("abc")
+
+    assert cache.read("abc_thumb.jpg") is None
+    assert cache.read("abc_sprite.jpg") is None
+    assert cache.read("def_thumb.jpg") is not None
+
+
+@pytest.fixture
+def previews(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "cache", ThumbnailCache(str(tmp_path / "previews"), max_bytes=10_000))
+    monkeypatch.setattr(thumbnails, "_executors", {})
+    monkeypatch.setattr(thumbnails, "_pending", {})
+    monkeypatch.setattr(thumbnails, "_failures", {})
+    video = tmp_path / "video.ts"
+    video.write_bytes(b"\x47" * 188)
+    yield str(video)
+    thumbnails.shutdown()
+
+
+def wait_idle(timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while thumbnails._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not thumbnails._pending
+
+
+def test_request_renders_in_background_and_caches_failures(previews):
+    calls = []
+
+    def render_ok(video_path, output_path):
+        calls.append("ok")
+        with open(output_path, "wb") as f:
+            f.write(b"jpg")
+
+    def render_fail(video_path, output_path):
+        calls.append("fail")
+        raise thumbnails.ThumbnailError("corrupt")
+
+    assert thumbnails._request("a.jpg", previews, render_ok, "thumbnail") is None
+    wait_idle()
+    assert thumbnails._request("a.jpg", previews, render_ok, "thumbnail") == b"jpg"
+
+    future = thumbnails._submit("b.jpg", previews, render_fail, "thumbnail")
+    assert isinstance(future.exception(), thumbnails.ThumbnailError)
+    with pytest.raises(thumbnails.ThumbnailError):
+        thumbnails._request("b.jpg", previews, render_fail, "thumbnail")
+    assert calls == ["ok", "fail"]
+    assert thumbnails._pending == {}
+
+
+def test_sprites_do_not_block_thumbnails(previews):
+    release = threading.Event()
+
+    def slow_sprite(video_path, output_path):
+        release.wait(5)
+        raise thumbnails.ThumbnailError("cancelled")
+
+    def thumbnail(video_path, output_path):
+        with open(output_path, "wb") as f:
+            f.write(b"jpg")
+
+    for i in range(3):
+        thumbnails._submit(f"{i}_sprite.jpg", previews, slow_sprite, "sprite")
+    try:
+        future = thumbnails._submit("x_thumb.jpg", previews, thumbnail, "thumbnail")
+        future.result(timeout=2)
+    finally:
+        release.set()
+
+
+def test_missing_video_is_not_queued(previews):
+    with pytest.raises(FileNotFoundError):
+        thumbnails._request("a.jpg", previews + ".gone", lambda v, o: None, "thumbnail")
+    assert thumbnails._pending == {}
@@ -0,0 +1,148 @@
+from datetime import datetime
+
+from app.models import Channel, Recording
+from app.models.recording import RecordingStatus
+
+
+def add_channel(db, name: str = "ch", timezone: str = "UTC") -> Channel:
+    channel = Channel(name=name, m3u8_url="http://example.com/live.m3u8", timezone=timezone)
+    db.add(channel)
+    db.commit()
+    return channel
+
+
+def add_recording(db, channel: Channel, title: str, start: datetime, end: datetime) -> Recording:
+    recording = Recording(channel=channel, title=title, start_time=start, end_time=end)
+    db.add(recording)
+    db.commit()
+    return recording
+
+
+def get_days(client, start: str, end: str, **params) -> dict:
+    res = client.get("/api/timeline", params={"from": start, "to": end, **params})
+    assert res.status_code == 200, res.text
+    channels = res.json()["channels"]
+    return {
+        c["channel_name"]: {d["date"]: [r["title"] for r in d["recordings"]] for d in c["days"]}
+        for c in channels
+    }
+
+
+def test_overnight_recording_is_listed_on_each_local_day(client, db):
+    channel = add_channel(db, timezone="Asia/Tokyo")
+    # 23:00-01:00 JST
+    add_recording(db, channel, "overnight", datetime(2026, 1, 1, 14), datetime(2026, 1, 1, 16))
+    add_recording(db, channel, "morning", datetime(2026, 1, 2, 0), datetime(2026, 1, 2, 1))
+
+    days = get_days(client, "2026-01-01T00:00:00Z", "2026-01-03T00:00:00Z")
+
+    assert days["ch"] == {
+        "2026-01-01": ["overnight"],
+        "2026-01-02": ["overnight", "morning"],
+    }
+
+
+def test_recordings_are_clipped_to_the_range(client, db):
+    channel = add_channel(db)
+    add_recording(db, channel, "before", datetime(2025, 12, 31, 22), datetime(2026, 1, 1, 2))
+    add_recording(db, channel, "after", datetime(2026, 1, 1, 23), datetime(2026, 1, 2, 3))
+    add_recording(db, channel, "outside", datetime(2025, 12, 30), datetime(2025, 12, 30, 1))
+
+    days = get_days(client, "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z")
+
+    assert days["ch"] == {"2026-01-01": ["before", "after"]}
+
+
+def test_long_recordings_are_found(client, db):
+    channel = add_channel(db)
+    add_recording(db, channel, "two days", datetime(2026, 1, 1), datetime(2026, 1, 3))
+
+    days = get_days(client, "2026-01-02T12:00:00Z", "2026-01-02T13:00:00Z")
+
+    assert days["ch"] == {"2026-01-02": ["two days"]}
+
+
+def test_long_recording_created_after_first_query_is_found(client, db):
+    channel = add_channel(db)
+    add_recording(db, channel, "short", datetime(2026, 1, 1), datetime(2026, 1, 1, 1))
+    get_days(client, "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z")
+
+    res = client.post("/api/recordings", json={
+        "channel_id": str(channel.id),
+        "title": "three days",
+        "start_time": "2026-02-01T00:00:00",
+        "end_time": "2026-02-04T00:00:00",
+    })
+    assert res.status_code == 201, res.text
+
+    days = get_days(client, "2026-02-03T00:00:00Z", "2026-02-03T01:00:00Z")
+    assert days["ch"] == {"2026-02-03": ["three days"]}
+
+
+def test_dst_transition_days(client, db):
+    channel = add_channel(db, timezone="America/New_York")
+    # 23:30 EST on Mar 7 to 03:30 EDT on Mar 8 (clocks jump forward at 02:00)
+    add_recording(db, channel, "across dst", datetime(2026, 3, 8, 4, 30), datetime(2026, 3, 8, 7, 30))
+    # 23:30-00:30 EDT, crossing the end of the 23-hour local day
+    add_recording(db, channel, "late", datetime(2026, 3, 9, 3, 30), datetime(2026, 3, 9, 4, 30))
+
+    # Local midnight to local midnight of Mar 8 (23 hours)
+    res = client.get("/api/timeline", params={"from": "2026-03-08T05:00:00Z", "to": "2026-03-09T04:00:00Z"})
+    assert res.status_code == 200
+    [timeline] = res.json()["channels"]
+    [day] = timeline["days"]
+
+    assert day["date"] == "2026-03-08"
+    assert [r["title"] for r in day["recordings"]] == ["across dst", "late"]
+    assert day["recordings"][0]["channel_start_time"] == "2026-03-07 23:30"
+    assert day["recordings"][0]["channel_end_time"] == "2026-03-08 03:30"
+
+    days = get_days(client, "2026-03-07T00:00:00Z", "2026-03-10T00:00:00Z")
+    assert days["ch"] == {
+        "2026-03-07": ["across dst"],
+        "2026-03-08": ["across dst", "late"],
+        "2026-03-09": ["late"],
+    }
+
+
+def test_channels_without_recordings_are_listed(client, db):
+    add_channel(db, name="empty")
+
+    days = get_days(client, "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z")
+
+    assert days == {"empty": {}}
+
+
+def test_channel_filter(client, db):
+    channel = add_channel(db, name="a")
+    add_channel(db, name="b")
+    add_recording(db, channel, "show", datetime(2026, 1, 1, 1), datetime(2026, 1, 1, 2))
+
+    days = get_days(client, "2026-01-01T00:00:00Z", "2026-01-02T00:00:00Z", channel_id=str(channel.id))
+
+    assert days == {"a": {"2026-01-01": ["show"]}}
+
+
+def test_unknown_channel_returns_404(client, db):
+    res = client.get("/api/timeline", params={
+        "from": "2026-01-01T00:00:00Z",
+        "to": "2026-01-02T00:00:00Z",
+        "channel_id": "00000000-0000-0000-0000-000000000000",
+    })
+    assert res.status_code == 404
+
+
+def test_invalid_ranges_are_rejected(client, db):
+    assert client.get("/api/timeline", params={"from": "2026-01-02T00:00:00Z", "to": "2026-01-01T00:00:00Z"}).status_code == 400
+    assert client.get("/api/timeline", params={"from": "2026-01-01T00:00:00Z", "to": "2026-06-01T00:00:00Z"}).status_code == 400
+
+
+def test_title_only_update_of_long_recording(client, db):
+    channel = add_channel(db)
+    recording = add_recording(db, channel, "two days", datetime(2030, 1, 1), datetime(2030, 1, 3))
+    assert recording.status == RecordingStatus.SCHEDULED
+
+    res = client.put(f"/api/recordings/{recording.id}", json={"title": "renamed"})
+
+    assert res.status_code == 200, res.text
+    assert res.json()["title"] == "renamed"
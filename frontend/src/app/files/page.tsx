@@ -1,8 +1,9 @@
 'use client'
 
+import { useEffect, useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { filesApi, RecordedFile } from '@/lib/api'
-import { FolderOpen, Download, Trash2, FileVideo, HardDrive, Calendar } from 'lucide-react'
+import { filesApi, RecordedFile, SPRITE_LAYOUT } from '@/lib/api'
+import { FolderOpen, Download, Trash2, FileVideo, HardDrive, Calendar, Clock, ShieldCheck, AlertTriangle } from 'lucide-react'
 import { format } from 'date-fns'
 
 function formatFileSize(bytes: number | null): string {
@@ -20,6 +21,158 @@ function formatFileSize(bytes: number | null): string {
   return `${size.toFixed(1)} ${units[unitIndex]}`
 }
 
+function formatDuration(seconds: number | null): string {
+  if (seconds === null) return '不明'
+  const total = Math.round(seconds)
+  const h = Math.floor(total / 3600)
+  const m = Math.floor((total % 3600) / 60)
+  const s = total % 60
+  return h > 0
+    ? `${h}:${String(m).padStart(2, '0')}:${String(s).padStart(2, '0')}`
+    : `${m}:${String(s).padStart(2, '0')}`
+}
+
+// Previews are rendered in the background; the API answers 202 until the image is ready
+const PREVIEW_RETRY_DELAY = 3000
+const PREVIEW_MAX_RETRIES = 20
+
+// Fetches a preview once `enabled` is set, polling while the API answers 202.
+// Any other non-200 status (404 for a missing file or a failed render) stops immediately.
+function usePreviewImage(url: string, enabled: boolean) {
+  const [src, setSrc] = useState<string | null>(null)
+  const [failed, setFailed] = useState(false)
+
+  useEffect(() => {
+    if (!enabled) return
+    let cancelled = false
+    let timer: ReturnType<typeof setTimeout> | undefined
+    let objectUrl: string | null = null
+
+    const load = async (attempt: number) => {
+      try {
+        const res = await fetch(url)
+        if (cancelled) return
+        if (res.status === 202) {
+          if (attempt + 1 >= PREVIEW_MAX_RETRIES) {
+            setFailed(true)
+            return
+          }
+          const retryAfter = Number(res.headers.get('Retry-After')) * 1000 || PREVIEW_RETRY_DELAY
+          timer = setTimeout(() => load(attempt + 1), retryAfter)
+          return
+        }
+        if (res.status !== 200) {
+          setFailed(true)
+          return
+        }
+        const blob = await res.blob()
+        if (cancelled) return
+        objectUrl = URL.createObjectURL(blob)
+        setSrc(objectUrl)
+      } catch {
+        if (!cancelled) setFailed(true)
+      }
+    }
+    load(0)
+
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+      if (objectUrl) URL.revokeObjectURL(objectUrl)
+    }
+  }, [url, enabled])
+
+  return { src, failed }
+}
+
+function useInView<T extends Element>() {
+  const [element, setElement] = useState<T | null>(null)
+  const [inView, setInView] = useState(false)
+
+  useEffect(() => {
+    if (!element || inView) return
+    const observer = new IntersectionObserver(([entry]) => {
+      if (entry.isIntersecting) setInView(true)
+    })
+    observer.observe(element)
+    return () => observer.disconnect()
+  }, [element, inView])
+
+  return { ref: setElement, inView }
+}
+
+function PreviewPlaceholder() {
+  return (
+    <div className="p-3 bg-amber-500/20 text-amber-400 rounded-lg">
+      <FileVideo className="w-6 h-6" />
+    </div>
+  )
+}
+
+function FilePreview({ file }: { file: RecordedFile }) {
+  if (file.missing_at) return <PreviewPlaceholder />
+  return <FilePreviewImage file={file} />
+}
+
+function FilePreviewImage({ file }: { file: RecordedFile }) {
+  const { ref, inView } = useInView<HTMLDivElement>()
+  const [hovered, setHovered] = useState(false)
+  const [hoverIndex, setHoverIndex] = useState<number | null>(null)
+  const thumbnail = usePreviewImage(filesApi.thumbnailUrl(file.id), inView)
+  // The sprite is only requested once the row has been hovered
+  const sprite = usePreviewImage(filesApi.spriteUrl(file.id), hovered)
+
+  if (thumbnail.failed) return <PreviewPlaceholder />
+
+  const { columns, rows } = SPRITE_LAYOUT
+  const frameCount = columns * rows
+
+  const handleMouseMove = (e: React.MouseEvent<HTMLDivElement>) => {
+    const rect = e.currentTarget.getBoundingClientRect()
+    const ratio = Math.min(Math.max((e.clientX - rect.left) / rect.width, 0), 0.9999)
+    setHovered(true)
+    setHoverIndex(Math.floor(ratio * frameCount))
+  }
+
+  const col = hoverIndex !== null ? hoverIndex % columns : 0
+  const row = hoverIndex !== null ? Math.floor(hoverIndex / columns) : 0
+
+  return (
+    <div
+      ref={ref}
+      className="relative w-40 aspect-video bg-zinc-800 rounded-lg overflow-hidden flex-shrink-0"
+      onMouseMove={sprite.failed ? undefined : handleMouseMove}
+      onMouseLeave={() => setHoverIndex(null)}
+    >
+      {thumbnail.src && (
+        <img
+          src={thumbnail.src}
+          alt=""
+          className="w-full h-full object-cover"
+        />
+      )}
+      {hoverIndex !== null && (
+        <>
+          {sprite.src && (
+            <div
+              className="absolute inset-0 bg-no-repeat"
+              style={{
+                backgroundImage: `url(${sprite.src})`,
+                backgroundSize: `${columns * 100}% ${rows * 100}%`,
+                backgroundPosition: `${(col / (columns - 1)) * 100}% ${(row / (rows - 1)) * 100}%`,
+              }}
+            />
+          )}
+          <div
+            className="absolute bottom-0 left-0 h-0.5 bg-amber-400"
+            style={{ width: `${((hoverIndex + 1) / frameCount) * 100}%` }}
+          />
+        </>
+      )}
+    </div>
+  )
+}
+
 export default function FilesPage() {
   const queryClient = useQueryClient()
 
@@ -35,6 +188,14 @@ export default function FilesPage() {
     },
   })
 
+  const verifyMutation = useMutation({
+    mutationFn: filesApi.verify,
+    onSuccess: (result) => {
+      queryClient.invalidateQueries({ queryKey: ['files'] })
+      alert(result.valid ? 'ファイルは正常です' : 'チェックサムが一致しません')
+    },
+  })
+
   const handleDownload = (file: RecordedFile) => {
     window.open(filesApi.downloadUrl(file.id), '_blank')
   }
@@ -74,9 +235,7 @@ export default function FilesPage() {
             <div key={file.id} className="card hover:border-zinc-700 transition-all">
               <div className="flex items-start justify-between">
                 <div className="flex items-start gap-4">
-                  <div className="p-3 bg-amber-500/20 text-amber-400 rounded-lg">
-                    <FileVideo className="w-6 h-6" />
-                  </div>
+                  <FilePreview file={file} />
                   <div>
                     <h3 className="text-lg font-semibold">
                       {file.recording?.title || 'Unknown Recording'}
@@ -89,6 +248,27 @@ export default function FilesPage() {
                         <HardDrive className="w-4 h-4" />
                         {formatFileSize(file.file_size)}
                       </span>
+                      {file.duration_seconds !== null && (
+                        <span className="flex items-center gap-1">
+                          <Clock className="w-4 h-4" />
+                          {formatDuration(file.duration_seconds)}
+                        </span>
+                      )}
+                      {file.missing_at && (
+                        <span className="flex items-center gap-1 text-red-400">
+                          <AlertTriangle className="w-4 h-4" />
+                          ディスク上にありません
+                        </span>
+                      )}
+                      {!!file.continuity_errors && (
+                        <span
+                          className="flex items-center gap-1 text-amber-400"
+                          title="TSパケットの連続性エラー"
+                        >
+                          <AlertTriangle className="w-4 h-4" />
+                          {file.continuity_errors}
+                        </span>
+                      )}
                       <span className="flex items-center gap-1">
                         <Calendar className="w-4 h-4" />
                         {format(new Date(file.created_at), 'yyyy/MM/dd HH:mm')}
@@ -102,6 +282,16 @@ export default function FilesPage() {
                   </div>
                 </div>
                 <div className="flex items-center gap-2">
+                  {file.checksum_sha256 && (
+                    <button
+                      onClick={() => verifyMutation.mutate(file.id)}
+                      disabled={verifyMutation.isPending}
+                      className="p-2 text-zinc-400 hover:text-sky-400 hover:bg-sky-500/10 rounded-lg transition-all disabled:opacity-50"
+                      title="整合性チェック"
+                    >
+                      <ShieldCheck className="w-5 h-5" />
+                    </button>
+                  )}
                   <button
                     onClick={() => handleDownload(file)}
                     className="p-2 text-zinc-400 hover:text-emerald-400 hover:bg-emerald-500/10 rounded-lg transition-all"
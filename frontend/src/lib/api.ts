@@ -25,10 +25,27 @@ export interface RecordedFile {
   recording_id: string
   file_path: string
   file_size: number | null
+  checksum_sha256: string | null
+  duration_seconds: number | null
+  bitrate: number | null
+  continuity_errors: number | null
+  pcr_discontinuities: number | null
+  verified_at: string | null
+  missing_at: string | null
   created_at: string
   recording?: Recording
 }
 
+export interface FileVerification {
+  file_id: string
+  valid: boolean
+  expected_sha256: string
+  actual_sha256: string
+  expected_size: number | null
+  actual_size: number
+  verified_at: string
+}
+
 export interface TimeConversion {
   channel_timezone: string
   channel_start_time: string
@@ -97,6 +114,15 @@ export const filesApi = {
   get: (id: string) => fetchApi<RecordedFile>(`/api/files/${id}`),
   delete: (id: string) => 
     fetchApi<void>(`/api/files/${id}`, { method: 'DELETE' }),
+  verify: (id: string) => 
+    fetchApi<FileVerification>(`/api/files/${id}/verify`, { method: 'POST' }),
   downloadUrl: (id: string) => `${API_BASE}/api/files/${id}/download`,
+  thumbnailUrl: (id: string) => `${API_BASE}/api/files/${id}/thumbnail`,
+  spriteUrl: (id: string) => `${API_BASE}/api/files/${id}/sprite`,
 }
 
+// Sprite sheet layout (must match backend app/services/thumbnails.py)
+export const SPRITE_LAYOUT = {
+  columns: 10,
+  rows: 10,
+}